@@ -1,8 +1,13 @@
 import pygame
-import random
 import time
-import os
-from collections import deque  
+from game2048 import AdaptiveGame
+from ai2048 import make_player
+from render2048 import BoardRenderer, Hud
+from bitboard import DIRECTIONS
+from gameloop import IdleLoop
+from profiler import profiler_from_env
+from replay import NEXT_BRANCH, REDO, UNDO, recorder_from_env
+from scores import ScoreKeeper
 
 # Initialize Pygame
 pygame.init()
@@ -14,9 +19,11 @@ MARGIN = 5
 WIDTH, HEIGHT = (GRID_SIZE * TILE_SIZE) + (MARGIN * (GRID_SIZE + 1)), (GRID_SIZE * TILE_SIZE) + (MARGIN * (GRID_SIZE + 1)) + 100
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
-FONT = pygame.font.Font(None, 30)
-TIMER_FONT = pygame.font.Font(None, 40)
-SCORE_FONT = pygame.font.Font(None, 35)
+TILE_FONT_SIZE = 30
+TIMER_FONT_SIZE = 40
+SCORE_FONT_SIZE = 35
+SLIDE_TIME = 0.1  # Seconds a move's tiles take to slide into place
+AI_SLIDE_TIME = 1 / 30  # Shorter for the AI player, which moves as soon as they land
 
 # Tile Colors
 TILE_COLORS = {
@@ -39,192 +46,136 @@ TILE_COLORS = {
 
 # High Score File
 HIGH_SCORE_FILE = "high_score.txt"
-
-# Initialize Grid & Timer
-grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
-score = 0
-start_time = time.time()
-undo_stack = deque(maxlen=5)
-last_direction = None  
-
-# Load high score from file
-def load_high_score():
-    if os.path.exists(HIGH_SCORE_FILE):
-        with open(HIGH_SCORE_FILE, "r") as file:
-            return int(file.read().strip())
-    return 0
-
-def save_high_score(new_score):
-    with open(HIGH_SCORE_FILE, "w") as file:
-        file.write(str(new_score))
-
-high_score = load_high_score()
-
-def get_highest_tile():
-    """Returns the highest tile in the grid."""
-    return max(max(row) for row in grid)
-
-def get_new_tile_value():
-    """Determines the new tile value based on the highest tile present."""
-    highest_tile = get_highest_tile()
-    
-    if highest_tile >= 16384:
-        return 4096
-    elif highest_tile >= 8192:
-        return 2048
-    elif highest_tile >= 4096:
-        return 1024
-    elif highest_tile >= 2048:
-        return 512
-    elif highest_tile >= 1024:
-        return 256
-    elif highest_tile >= 512:
-        return 128
-    elif highest_tile >= 256:
-        return 64
-    elif highest_tile >= 128:
-        return 32
-    elif highest_tile >= 64:
-        return 16
-    elif highest_tile >= 32:
-        return 8
+VARIANT = f"2048-adaptive-{GRID_SIZE}x{GRID_SIZE}"
+
+# Initialize Game & Timer
+recorder = recorder_from_env("2048-adaptive", {"size": GRID_SIZE})  # Set GAME_REPLAY=file to record
+game = AdaptiveGame(recorder.seed, size=GRID_SIZE)
+player = make_player(game)
+autoplay = False  # Toggled with A
+start_time = time.monotonic()
+
+# High score is kept in memory and written in the background and at game over
+scores = ScoreKeeper(VARIANT, HIGH_SCORE_FILE)
+game_logged = False  # This game is in the leaderboard log
+
+def draw_grid(board_view, hud, profiler):
+    """Draws the changed tiles, timer, score, and the profiler overlay if it is on."""
+    # Timer Display, replaced by the game-over notice once no move is left
+    if game.check_game_over():
+        hud.set("timer", "Game Over!", TIMER_FONT_SIZE, BLACK, (WIDTH // 2 - 100, 10))
     else:
-        return 2 if random.random() < 0.9 else 4  # Default case
-
-def add_new_tile():
-    """Adds a new tile based on the highest tile in the grid."""
-    empty_cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if grid[r][c] == 0]
-    if empty_cells:
-        r, c = random.choice(empty_cells)
-        grid[r][c] = get_new_tile_value()
-
-def draw_grid(screen):
-    """Draws the grid, timer, and score."""
-    screen.fill(WHITE)
-    
-    # Timer Display
-    elapsed_time = int(time.time() - start_time)
-    minutes = elapsed_time // 60
-    seconds = elapsed_time % 60
-    timer_text = TIMER_FONT.render(f"Time: {minutes:02}:{seconds:02}", True, BLACK)
-    screen.blit(timer_text, (WIDTH // 2 - 100, 10))
+        elapsed_time = int(time.monotonic() - start_time)
+        minutes = elapsed_time // 60
+        seconds = elapsed_time % 60
+        hud.set("timer", f"Time: {minutes:02}:{seconds:02}", TIMER_FONT_SIZE, BLACK, (WIDTH // 2 - 100, 10))
 
     # Score Display
-    score_text = SCORE_FONT.render(f"Score: {score}", True, BLACK)
-    screen.blit(score_text, (20, 10))
+    hud.set("score", f"Score: {game.score}", SCORE_FONT_SIZE, BLACK, (20, 10))
 
     # High Score Display
-    high_score_text = SCORE_FONT.render(f"High Score: {high_score}", True, BLACK)
-    screen.blit(high_score_text, (WIDTH - 200, 10))
-
-    for r in range(GRID_SIZE):
-        for c in range(GRID_SIZE):
-            value = grid[r][c]
-            rect = pygame.Rect(c * (TILE_SIZE + MARGIN) + MARGIN, r * (TILE_SIZE + MARGIN) + MARGIN + 50, TILE_SIZE, TILE_SIZE)
-            pygame.draw.rect(screen, TILE_COLORS.get(value, (0, 0, 0)), rect, border_radius=10)
-            if value:
-                text = FONT.render(str(value), True, BLACK if value < 8 else WHITE)
-                text_rect = text.get_rect(center=rect.center)
-                screen.blit(text, text_rect)
-
-    pygame.display.update()
-
-def move_left():
-    """Moves tiles left and merges if possible."""
-    global grid, score, high_score
-    moved = False
-    new_grid = []
-    
-    for row in grid:
-        new_row = [x for x in row if x != 0]
-        for i in range(len(new_row) - 1):
-            if new_row[i] == new_row[i + 1]:
-                new_row[i] *= 2
-                score += new_row[i]
-                new_row[i + 1] = 0
-        new_row = [x for x in new_row if x != 0]
-        new_row.extend([0] * (GRID_SIZE - len(new_row)))
-        new_grid.append(new_row)
-    
-    if new_grid != grid:
-        undo_stack.append([row[:] for row in grid])
-        grid = new_grid
-        moved = True
-    
-    if score > high_score:
-        high_score = score
-        save_high_score(high_score)
-    
-    return moved
-
-def move_right():
-    global grid
-    grid = [row[::-1] for row in grid]
-    moved = move_left()
-    grid = [row[::-1] for row in grid]
-    return moved
-
-def move_up():
-    global grid
-    grid = list(map(list, zip(*grid)))  # Transpose
-    moved = move_left()
-    grid = list(map(list, zip(*grid)))  # Transpose back
-    return moved
-
-def move_down():
-    global grid
-    grid = list(map(list, zip(*grid)))  # Transpose
-    grid = [row[::-1] for row in grid]
-    moved = move_left()
-    grid = [row[::-1] for row in grid]
-    grid = list(map(list, zip(*grid)))  # Transpose back
-    return moved
-
-def handle_key(event):
-    """Handles key presses for movement and undo."""
-    global last_direction
-
-    direction = None
-    if event.key == pygame.K_LEFT:
-        direction = "left"
-        moved = move_left()
-    elif event.key == pygame.K_RIGHT:
-        direction = "right"
-        moved = move_right()
-    elif event.key == pygame.K_UP:
-        direction = "up"
-        moved = move_up()
-    elif event.key == pygame.K_DOWN:
-        direction = "down"
-        moved = move_down()
-    elif event.key == pygame.K_u and undo_stack:
-        global grid
-        grid = undo_stack.pop()  
-        return  
-
-    if moved and direction != last_direction:
-        add_new_tile()  
-        last_direction = direction  
+    hud.set("high_score", f"High Score: {scores.high_score}", SCORE_FONT_SIZE, BLACK, (WIDTH - 200, 10))
+
+    dirty = hud.draw() + board_view.draw(game.grid)
+    overlay = profiler.draw_overlay(board_view.screen)
+    if overlay:
+        dirty.append(overlay)
+        # Whatever it covered is repainted next time
+        hud.invalidate()
+        board_view.invalidate()
+    if dirty:
+        pygame.display.update(dirty)
+
+# Key bindings
+KEY_DIRECTIONS = {
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_UP: "up",
+    pygame.K_DOWN: "down",
+}
+
+def log_game():
+    """Adds the current game to the leaderboard log once."""
+    global game_logged
+    if not game_logged and game.moves:
+        scores.game_over(game.score, game.moves, game.get_highest_tile())
+        game_logged = True
+
+def play(direction, board_view, slide_time=SLIDE_TIME):
+    """Plays one move; a new high score stays in memory until the next flush."""
+    recorder.record(DIRECTIONS.index(direction))
+    game.move(direction)
+    board_view.animate(game.last_moves, slide_time)
+    scores.submit(game.score)
+    if game.check_game_over():
+        log_game()
+
+def handle_key(event, board_view):
+    """Handles key presses for movement, undo/redo and the AI player.
+
+    U undoes and R redoes any number of moves. After undoing and playing
+    a different move, B picks which of the timelines R goes back along.
+    """
+    global autoplay
+
+    if event.key in KEY_DIRECTIONS:
+        play(KEY_DIRECTIONS[event.key], board_view)
+    elif event.key == pygame.K_u:
+        recorder.record(UNDO)
+        game.undo()
+        board_view.finish()
+    elif event.key == pygame.K_r:
+        recorder.record(REDO)
+        if game.redo():
+            board_view.animate(game.last_moves, SLIDE_TIME)
+    elif event.key == pygame.K_b:
+        recorder.record(NEXT_BRANCH)
+        game.next_branch()
+    elif event.key == pygame.K_a:
+        autoplay = not autoplay
 
 def main():
     global start_time
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("2048 - 8x8")
 
-    add_new_tile()
-    add_new_tile()
-    start_time = time.time()
-
-    running = True
-    while running:
-        draw_grid(screen)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                handle_key(event)
-
+    screen.fill(WHITE)
+    pygame.display.flip()
+    board_view = BoardRenderer(screen, GRID_SIZE, TILE_SIZE, MARGIN, TILE_COLORS, TILE_FONT_SIZE,
+                               origin=(0, 50), background=WHITE, fallback_color=(0, 0, 0),
+                               text_color=lambda value: BLACK if value < 8 else WHITE,
+                               border_radius=10)
+    hud = Hud(screen, (0, 0, WIDTH, 50), WHITE)
+    profiler = profiler_from_env()  # Set GAME_PROFILE=1 for the F3 overlay
+
+    def handle_event(event):
+        if profiler.handle_event(event):
+            hud.invalidate()
+            board_view.invalidate()
+            return True
+        if event.type == pygame.KEYDOWN:
+            # The history node changes whenever the game state does: no grid copy to compare
+            version = game.history.node
+            handle_key(event, board_view)
+            return game.history.node != version
+        return False
+
+    def autoplay_step():
+        # The AI player moves once the tiles of its last move have landed
+        if autoplay and not board_view.animating and not game.check_game_over():
+            play(player.choose_move(), board_view, AI_SLIDE_TIME)
+
+    # Redraws on key presses and once a second for the timer, and at up to
+    # 60 frames a second while tiles slide or the AI player is on
+    loop = IdleLoop(handle_event, lambda: draw_grid(board_view, hud, profiler), interval=1.0,
+                    busy=lambda: board_view.animating or (autoplay and not game.check_game_over()),
+                    step=autoplay_step, busy_rate=60, profiler=profiler)
+    start_time = time.monotonic()
+    loop.run(start_time)
+
+    log_game()
+    scores.close()
+    recorder.close(game)
     pygame.quit()
 
 if __name__ == "__main__":
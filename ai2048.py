@@ -0,0 +1,254 @@
+"""Auto-players for the 2048 games.
+
+ExpectimaxPlayer searches max (move) and chance (spawn) nodes to a
+limited depth, weighting spawns by the game's spawn odds. It caches chance
+node values in a bounded LRU transposition table keyed by the packed board,
+and deepens iteratively until its per-move time budget runs out. Branches
+less likely than min_probability are cut off with the heuristic, and since
+that depends on the path to a node and not just the node, values with a
+cut below them are never cached.
+
+On the 8x8 board the spawn branching makes that search too shallow to be
+useful, so MonteCarloPlayer instead scores each legal move by random
+rollouts within the same time budget. make_player picks the right one.
+"""
+
+import random
+import time
+from collections import OrderedDict
+
+from bitboard import MASK_DIRECTIONS
+
+
+class _Timeout(Exception):
+    """Raised inside a search when the move's time budget is spent."""
+
+
+class TranspositionTable:
+    """Bounded mapping with least-recently-used eviction."""
+
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+def row_heuristic(cells):
+    """Scores one row of exponents: empty cells, merges and monotonicity."""
+    empty = cells.count(0)
+    merges = 0
+    previous = 0
+    counter = 0
+    for exponent in cells:
+        if exponent == 0:
+            continue
+        if previous == exponent:
+            counter += 1
+        elif counter:
+            merges += 1 + counter
+            counter = 0
+        previous = exponent
+    if counter:
+        merges += 1 + counter
+
+    left = right = 0
+    for a, b in zip(cells, cells[1:]):
+        if a > b:
+            left += a ** 4 - b ** 4
+        else:
+            right += b ** 4 - a ** 4
+    total = sum(exponent ** 3.5 for exponent in cells)
+    return 270000.0 + 270.0 * empty + 700.0 * merges - 47.0 * min(left, right) - 11.0 * total
+
+
+class Heuristic:
+    """Board evaluation as a sum of memoized row scores over rows and columns."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = {}
+
+    def row(self, row):
+        score = self.rows.get(row)
+        if score is None:
+            cells = [(row >> (c * self.tables.bits)) & self.tables.cell_mask for c in range(self.tables.size)]
+            score = self.rows[row] = row_heuristic(cells)
+        return score
+
+    def __call__(self, board):
+        tables = self.tables
+        total = 0.0
+        for source in (board, tables.transpose(board)):
+            for r in range(tables.size):
+                total += self.row((source >> (r * tables.row_bits)) & tables.row_mask)
+        return total
+
+
+class ExpectimaxPlayer:
+    """Depth-limited expectimax with a transposition table and a time budget."""
+
+    def __init__(self, game, max_depth=3, time_budget=0.05, table_size=200_000, min_probability=1e-4):
+        self.game = game
+        self.tables = game.tables
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.min_probability = min_probability
+        self.table = TranspositionTable(table_size)
+        self.heuristic = Heuristic(self.tables)
+        # Only variants that skip spawns on repeated moves need the last
+        # direction as part of the search state.
+        self.track_direction = not game.spawns_after("left", "left")
+        self.nodes = 0
+        self.cut = False  # Set when a probability cutoff was hit since the last reset
+
+    def choose_move(self):
+        """Returns the best direction for the current board, or None if there is none."""
+        last = getattr(self.game, "last_direction", None)
+        moves = self.tables.legal_moves(self.game.board)
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return moves[0][0]
+
+        deadline = time.perf_counter() + self.time_budget
+        best = moves[0][0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = max(moves, key=lambda move: self._after_move(move, last, depth, 1.0, deadline))[0]
+            except _Timeout:
+                break
+        return best
+
+    def _after_move(self, move, last, depth, probability, deadline):
+        direction, board, _ = move
+        if self.game.spawns_after(direction, last):
+            return self._chance(board, direction, depth, probability, deadline)
+        return self._max(board, direction, depth - 1, probability, deadline)
+
+    def _max(self, board, last, depth, probability, deadline):
+        self.nodes += 1
+        if depth <= 0:
+            return self.heuristic(board)
+        if probability < self.min_probability:
+            self.cut = True
+            return self.heuristic(board)
+        if time.perf_counter() > deadline:
+            raise _Timeout
+        moves = self.tables.legal_moves(board)
+        if not moves:
+            return 0.0
+        return max(self._after_move(move, last, depth, probability, deadline) for move in moves)
+
+    def _chance(self, board, direction, depth, probability, deadline):
+        last = direction if self.track_direction else None
+        key = (board, last, depth)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+
+        empty_cells = self.tables.empty_cells(board)
+        if not empty_cells:
+            return self._max(board, last, depth - 1, probability, deadline)
+        odds = self.game.spawn_odds(board)
+        share = 1.0 / len(empty_cells)
+        total = 0.0
+        cut_above, self.cut = self.cut, False
+        for index in empty_cells:
+            for value, odd in odds:
+                child = self.tables.set(board, index, value)
+                total += odd * self._max(child, last, depth - 1, probability * odd * share, deadline)
+        total *= share
+        if not self.cut:
+            self.table.put(key, total)  # Exact for any path that reaches this node
+        self.cut |= cut_above
+        return total
+
+
+class MonteCarloPlayer:
+    """Scores each legal move by the mean score of short random rollouts."""
+
+    def __init__(self, game, time_budget=0.05, rollout_depth=20, seed=None):
+        self.game = game
+        self.tables = game.tables
+        self.time_budget = time_budget
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self.rollouts = 0
+
+    def choose_move(self):
+        """Returns the best direction for the current board, or None if there is none."""
+        last = getattr(self.game, "last_direction", None)
+        moves = self.tables.legal_moves(self.game.board)
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return moves[0][0]
+
+        totals = [0.0] * len(moves)
+        counts = [0] * len(moves)
+        deadline = time.perf_counter() + self.time_budget
+        while True:
+            for i, move in enumerate(moves):
+                totals[i] += self._rollout(move, last)
+                counts[i] += 1
+            if time.perf_counter() > deadline:
+                break
+        self.rollouts += sum(counts)
+        best = max(range(len(moves)), key=lambda i: totals[i] / counts[i])
+        return moves[best][0]
+
+    def _spawn(self, board):
+        empty_cells = self.tables.empty_cells(board)
+        if not empty_cells:
+            return board
+        roll = self.rng.random()
+        for value, odd in self.game.spawn_odds(board):
+            roll -= odd
+            if roll < 0:
+                break
+        return self.tables.set(board, self.rng.choice(empty_cells), value)
+
+    def _rollout(self, move, last):
+        direction, board, score = move
+        for _ in range(self.rollout_depth):
+            if self.game.spawns_after(direction, last):
+                board = self._spawn(board)
+            last = direction
+            # Pick among the legal directions and compute only that move
+            legal = MASK_DIRECTIONS[self.tables.legal_mask(board)]
+            if not legal:
+                break
+            direction = self.rng.choice(legal)
+            board, gained = self.tables.move(board, direction)
+            score += gained
+        return score
+
+
+def make_player(game, time_budget=0.05):
+    """Returns expectimax for 4x4 boards and Monte Carlo rollouts for larger ones."""
+    if game.size <= 4:
+        return ExpectimaxPlayer(game, time_budget=time_budget)
+    return MonteCarloPlayer(game, time_budget=time_budget)
@@ -0,0 +1,363 @@
+"""Display-free simulations for the arcade games.
+
+    FlappySim  - bird game.py
+    EggSim     - egg catching.py
+    PongSim    - pong.py
+
+Each step() advances the game by exactly one tick of the original
+per-frame physics (bird and eggs ran at 30 ticks a second, pong at 60), so
+the pygame scripts can run them from a fixed-timestep loop and headless
+tools can step them as fast as the CPU allows. Nothing in here imports
+pygame. All randomness comes from a seeded rng.
+
+step(dt=k) moves everything k ticks' worth in one step, for headless runs
+at high speed-ups: the tick counter advances by k, eggs get one spawn roll
+per tick and the basket and paddle stop at the screen edges. Collisions are
+swept over the whole step (sweep.py), so eggs, balls and the bird cannot
+pass through the basket, paddle or pipes between two checks; the end of
+step check of the original games is part of the sweep, so at dt=1 the
+sweep only adds hits that grazed an edge mid-tick.
+
+The original games let the basket and paddle overshoot the edge by one
+move and never swept. Replays recorded before that changed (format 1) set
+swept and clamped to False, which plays them exactly as they were.
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+
+from balls import BallStore, SpatialHash, collide_balls
+from entities import Egg, EntityPool, Pipe
+from sweep import time_of_impact, times_of_impact
+
+
+def lerp(previous, current, alpha):
+    """Interpolates between the previous and current tick for rendering."""
+    return previous + (current - previous) * alpha
+
+
+class FlappySim:
+    """Bird, pipes and score from bird game.py."""
+
+    TICK_RATE = 30
+    WIDTH, HEIGHT = 400, 600
+    bird_x = 100
+    bird_radius = 20  # Bird is a circle
+    gravity = 0.5
+    jump_strength = -8
+    pipe_width = 70
+    pipe_speed = 3
+    pipe_gap = 150
+    swept = True  # False: only check positions at the end of each step
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.pipes = deque([Pipe()])  # Ring of pipes, reused as they leave the screen
+        self.reset()
+
+    def reset(self):
+        self.bird_y = self.prev_bird_y = self.HEIGHT // 2
+        self.velocity = 0
+        for pipe in self.pipes:
+            self.place_pipe(pipe)
+        self.score = 0
+        self.game_over = False
+        self.ticks = 0
+
+    def place_pipe(self, pipe):
+        """Puts a pipe at the right edge with a new random gap."""
+        top_height = self.rng.randint(50, self.HEIGHT - self.pipe_gap - 50)
+        pipe.x = float(self.WIDTH)
+        pipe.top = top_height
+        pipe.bottom = top_height + self.pipe_gap
+
+    def step(self, jump=False, dt=1):
+        """Advances one tick (dt ticks); `jump` is True on ticks where SPACE was pressed."""
+        self.prev_bird_y = self.bird_y
+        if self.game_over:
+            return
+        self.ticks += dt
+        if jump:
+            self.velocity = self.jump_strength  # Jump effect
+
+        # Bird movement
+        self.velocity += self.gravity * dt
+        self.bird_y += self.velocity * dt
+
+        # Pipe movement and collision detection
+        pipes = self.pipes
+        shift = self.pipe_speed * dt
+        index = 0
+        while index < len(pipes):  # No deque iterator per tick
+            pipe = pipes[index]
+            index += 1
+            pipe.x -= shift
+            if (self.bird_x < pipe.x + self.pipe_width and self.bird_x + self.bird_radius > pipe.x and
+               (self.bird_y < pipe.top or self.bird_y + self.bird_radius > pipe.bottom)):
+                self.game_over = True
+            elif (self.swept and self.bird_x < pipe.x + shift + self.pipe_width and
+                  self.sweep_pipe(pipe, shift)):
+                self.game_over = True
+
+        # Off-screen pipes come back in at the right edge
+        if pipes[0].x < -self.pipe_width:
+            pipes.rotate(-1)
+            self.place_pipe(pipes[-1])
+            self.score += 1
+
+        if self.bird_y > self.HEIGHT or self.bird_y < 0:
+            self.game_over = True  # Hit ground or top
+
+    def sweep_pipe(self, pipe, shift):
+        """True if the bird touched the pipe at any time during the step."""
+        # Bird box moving relative to the pipe, which is held at its start
+        x0 = pipe.x + shift
+        size = self.bird_radius
+        vy = self.bird_y - self.prev_bird_y
+        for top, height in ((-self.HEIGHT, pipe.top + self.HEIGHT), (pipe.bottom, 2 * self.HEIGHT)):
+            if time_of_impact(self.bird_x, self.prev_bird_y, size, size, shift, vy,
+                              x0, top, self.pipe_width, height) is not None:
+                return True
+        return False
+
+    def pipe_x(self, pipe, alpha):
+        """Pipe x position interpolated between ticks."""
+        if self.game_over:
+            return pipe.x
+        return pipe.x + self.pipe_speed * (1 - alpha)
+
+
+class EggSim:
+    """Basket, falling eggs, score and lives from egg catching.py."""
+
+    TICK_RATE = 30
+    WIDTH, HEIGHT = 600, 400
+    basket_width = 80
+    basket_speed = 8
+    basket_height = 40
+    basket_y = HEIGHT - 60
+    spawn_chance = 2  # Percent per tick
+    spawn_y = 70
+    egg_speeds = (3, 6)  # Fastest included
+    hens = [(50, 20), (250, 20), (450, 20)]  # Hen positions
+    swept = True  # False: only check positions at the end of each step
+    clamped = True  # False: overshoot the edges like the original game
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.basket_x = self.prev_basket_x = self.WIDTH // 2
+        self.eggs = EntityPool(Egg)
+        self.reset()
+
+    def reset(self):
+        self.eggs.clear()
+        self.score = 0
+        self.lives = 3
+        self.ticks = 0
+
+    @property
+    def game_over(self):
+        return self.lives <= 0
+
+    def spawn_egg(self):
+        egg = self.eggs.spawn()
+        egg.x = self.rng.randint(50, self.WIDTH - 50)
+        egg.y = float(self.spawn_y)
+        egg.speed = self.rng.randint(*self.egg_speeds)
+        return egg
+
+    def roll_percent(self):
+        """The draw of rng.randint(1, 100) without its three Python-level calls.
+
+        randint(1, 100) is 1 + _randbelow(100), which rejects 7-bit draws of
+        100 and up; doing the same here keeps recorded replays valid.
+        """
+        roll = self.rng.getrandbits(7)
+        while roll >= 100:
+            roll = self.rng.getrandbits(7)
+        return roll + 1
+
+    def step(self, left=False, right=False, dt=1):
+        """Advances one tick (dt ticks) with the arrow keys held as given."""
+        self.prev_basket_x = self.basket_x
+        if self.game_over:
+            return
+        self.ticks += dt
+
+        # Move basket with keys
+        if left and self.basket_x > 0:
+            self.basket_x -= self.basket_speed * dt
+        if right and self.basket_x < self.WIDTH - self.basket_width:
+            self.basket_x += self.basket_speed * dt
+        if self.clamped:
+            self.basket_x = min(max(self.basket_x, 0), self.WIDTH - self.basket_width)
+
+        # Spawn eggs randomly, one roll per tick
+        tick = 0
+        while tick < dt:  # No range object per tick
+            if self.roll_percent() > 100 - self.spawn_chance:
+                egg = self.spawn_egg()
+                egg.y -= egg.speed * tick  # Only falls for the ticks after it spawned
+            tick += 1
+
+        # Move eggs
+        eggs = self.eggs
+        live = eggs.live
+        index = 0
+        while index < eggs.count:  # Live eggs only, no iterator per tick
+            egg = live[index]
+            index += 1
+            egg.y += egg.speed * dt
+
+            # Check if egg is caught
+            if ((self.basket_x < egg.x < self.basket_x + self.basket_width and
+                    self.basket_y < egg.y < self.basket_y + self.basket_height) or
+                    (self.swept and self.sweep_basket(egg, dt))):
+                eggs.release(egg)
+                self.score += 1
+
+            # Check if egg is missed
+            elif egg.y > self.HEIGHT:
+                eggs.release(egg)
+                self.lives -= 1
+        eggs.compact()
+
+    def sweep_basket(self, egg, dt):
+        """True if the egg was inside the basket at any time during the step."""
+        fall = egg.speed * dt
+        if egg.y - fall >= self.basket_y + self.basket_height or egg.y <= self.basket_y:
+            return False  # Never level with the basket this step
+        # The egg as a point moving relative to the basket at its start position
+        return time_of_impact(egg.x, egg.y - fall, 0, 0, self.prev_basket_x - self.basket_x, fall,
+                              self.prev_basket_x, self.basket_y, self.basket_width,
+                              self.basket_height) is not None
+
+    def egg_y(self, egg, alpha):
+        """Egg y position interpolated between ticks."""
+        if self.game_over:
+            return egg.y
+        return egg.y - egg.speed * (1 - alpha)
+
+
+class PongSim:
+    """Paddle and duplicating balls from pong.py.
+
+    Every paddle hit spawns another ball, so balls are kept in a
+    struct-of-arrays BallStore and moved, bounced and culled with NumPy
+    array operations. With ball_collisions=True balls also bounce off each
+    other through a spatial hash broadphase.
+    """
+
+    TICK_RATE = 60
+    WIDTH, HEIGHT = 600, 400
+    paddle_width, paddle_height = 100, 10
+    paddle_speed = 8
+    paddle_y = HEIGHT - 30
+    ball_radius = 10
+    ball_speed = 4  # Both axes
+    swept = True  # False: only check positions at the end of each step
+    clamped = True  # False: overshoot the edges like the original game
+
+    def __init__(self, seed=None, ball_collisions=False):
+        self.rng = np.random.default_rng(seed)
+        self.ball_collisions = ball_collisions
+        self.grid = SpatialHash(2 * self.ball_radius)
+        self.balls = BallStore()
+        self.paddle_x = self.prev_paddle_x = self.WIDTH // 2 - self.paddle_width // 2
+        self.reset()
+
+    def reset(self):
+        self.balls.clear()
+        self.serve()
+        self.lives = 3
+        self.score = 0
+        self.ticks = 0
+
+    @property
+    def game_over(self):
+        return self.lives <= 0
+
+    def random_dx(self, n):
+        return self.rng.choice((-self.ball_speed, self.ball_speed), size=n)
+
+    def serve(self):
+        """Adds a new ball at the top of the screen."""
+        self.balls.add(self.rng.integers(50, self.WIDTH - 50, endpoint=True), 0, self.random_dx(1),
+                       self.ball_speed)
+
+    def add_random_balls(self, n):
+        """Adds n balls at random positions (for stress tests and benchmarks)."""
+        self.balls.add(self.rng.uniform(0, self.WIDTH - self.ball_radius, n),
+                       self.rng.uniform(0, self.HEIGHT - 50, n),
+                       self.random_dx(n), self.random_dx(n))
+
+    def step(self, left=False, right=False, dt=1):
+        """Advances one tick (dt ticks) with the arrow keys held as given."""
+        self.prev_paddle_x = self.paddle_x
+        if self.game_over:
+            return
+        self.ticks += dt
+
+        # Paddle movement
+        if left and self.paddle_x > 0:
+            self.paddle_x -= self.paddle_speed * dt
+        if right and self.paddle_x < self.WIDTH - self.paddle_width:
+            self.paddle_x += self.paddle_speed * dt
+        if self.clamped:
+            self.paddle_x = min(max(self.paddle_x, 0), self.WIDTH - self.paddle_width)
+
+        # Ball movement
+        balls = self.balls
+        r = self.ball_radius
+        x, y, dx, dy = balls.x, balls.y, balls.dx, balls.dy
+        vx, vy = dx * dt, dy * dt
+        x += vx
+        y += vy
+
+        # Ball collision with walls
+        dx[(x <= 0) | (x >= self.WIDTH - r)] *= -1  # Reverse direction
+
+        # Ball collision with paddle
+        bottom = y + r
+        hit = ((self.paddle_y <= bottom) & (bottom <= self.paddle_y + self.paddle_height) &
+               (self.paddle_x <= x) & (x <= self.paddle_x + self.paddle_width))
+        if self.swept:
+            # Falling balls whose bottom crossed the paddle during the step
+            falling = np.flatnonzero(~hit & (vy > 0) & (bottom > self.paddle_y))
+            if len(falling):
+                toi = times_of_impact(x[falling] - vx[falling], bottom[falling] - vy[falling], 0, 0,
+                                      vx[falling], vy[falling], self.paddle_x, self.paddle_y,
+                                      self.paddle_width, self.paddle_height, closed=True)
+                hit[falling] = np.isfinite(toi)
+        hit = np.flatnonzero(hit)
+        if len(hit):
+            # Balls that went through the paddle come back to its bottom edge
+            y[hit] = np.minimum(y[hit], self.paddle_y + self.paddle_height - r)
+            dy[hit] *= -1  # Bounce upward
+            dx[hit] = self.random_dx(len(hit))  # Randomize horizontal movement
+            self.score += 10 * len(hit)  # Increase score
+            # Duplicate every ball that hit, slightly above the paddle
+            new_balls = (x[hit], y[hit] - 10, self.random_dx(len(hit)), -self.ball_speed)
+
+        if self.ball_collisions:
+            collide_balls(balls, r, self.grid)
+
+        # Ball falls below the screen (lose a life)
+        self.lives -= balls.remove(y > self.HEIGHT)
+
+        # Add new balls to the store
+        if len(hit):
+            balls.add(*new_balls)
+
+        # If no balls remain, serve a new one
+        if not len(balls) and self.lives > 0:
+            self.serve()
+
+    def ball_positions(self, alpha):
+        """Ball x and y arrays interpolated between ticks."""
+        balls = self.balls
+        if self.game_over:
+            return balls.x, balls.y
+        return balls.x - balls.dx * (1 - alpha), balls.y - balls.dy * (1 - alpha)
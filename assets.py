@@ -0,0 +1,124 @@
+"""Lazy, cached loading of image assets.
+
+AssetManager.image(name, size) finds the file (the repo ships its images
+as basket.png.png and so on, so a missing ".png" is tried doubled), scales
+it, converts it to the display's pixel format and keeps the result in
+memory keyed by (path, size). Images with transparency get
+convert_alpha(); fully opaque ones (all three shipped images) get
+convert(), which blits faster than per-pixel alpha. Nothing is decoded until
+an image is first asked for.
+
+Scaled images are also written to an on-disk cache as raw RGBA buffers,
+keyed by the source path, its modification time and the size. The next
+start reads the buffer straight into a surface instead of decoding the
+PNG and scaling it again; editing the source image invalidates its
+entries.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import pygame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def has_transparency(surface):
+    """True if any pixel is see-through (a colorkey or per-pixel alpha below 255)."""
+    return surface.get_colorkey() is not None or pygame.surfarray.array_alpha(surface).min() < 255
+
+
+class AssetManager:
+    """Loads images on first use and caches scaled, converted copies."""
+
+    def __init__(self, roots=(".", HERE), cache_dir=os.path.join(HERE, ".asset_cache")):
+        self.roots = roots
+        self.cache_dir = cache_dir
+        self.images = {}
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    def resolve(self, name):
+        """Returns the path of an asset, trying name and name + '.png' in every root."""
+        for root in self.roots:
+            for candidate in (name, name + ".png"):
+                path = os.path.join(root, candidate)
+                if os.path.isfile(path):
+                    return os.path.abspath(path)
+        raise FileNotFoundError(f"No asset named {name!r} in {', '.join(self.roots)}")
+
+    def _cache_path(self, path, size):
+        stat = os.stat(path)
+        key = f"{path}|{stat.st_mtime_ns}|{stat.st_size}|{size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".rgba")
+
+    def _load_scaled(self, path, size):
+        """Scaled RGBA surface from the disk cache, or decoded and scaled from the file."""
+        cache_path = self._cache_path(path, size) if self.cache_dir else None
+        if cache_path and size and os.path.exists(cache_path):
+            with open(cache_path, "rb") as file:
+                pixels = file.read()
+            if len(pixels) == size[0] * size[1] * 4:
+                self.disk_hits += 1
+                return pygame.image.frombytes(pixels, size, "RGBA")
+
+        surface = pygame.image.load(path)
+        if size:
+            surface = pygame.transform.scale(surface, size)
+            if cache_path:
+                self.disk_misses += 1
+                self._write_cache(cache_path, pygame.image.tobytes(surface, "RGBA"))
+        return surface
+
+    def _write_cache(self, cache_path, pixels):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as file:
+            file.write(pixels)
+        os.replace(temp_path, cache_path)  # Readers never see a half-written buffer
+
+    def image(self, name, size=None):
+        """Returns the image scaled to size (w, h) in the display format, loading it once."""
+        path = self.resolve(name)
+        key = (path, tuple(size) if size else None)
+        surface = self.images.get(key)
+        if surface is None:
+            surface = self._load_scaled(path, key[1])
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if has_transparency(surface) else surface.convert()
+            self.images[key] = surface
+        return surface
+
+    def clear(self):
+        """Drops the in-memory cache (e.g. after the display mode changed)."""
+        self.images.clear()
+
+
+if __name__ == "__main__":
+    import time
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((600, 400))
+    names = (("basket.png", (80, 50)), ("egg.png", (30, 40)), ("hen.png", (60, 60)))
+
+    start = time.perf_counter()
+    for name, size in names:
+        pygame.transform.scale(pygame.image.load(AssetManager().resolve(name)), size)
+    print(f"decode + scale:      {(time.perf_counter() - start) * 1000:7.2f} ms")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold disk cache:", "warm disk cache:"):
+            assets = AssetManager(cache_dir=cache_dir)
+            start = time.perf_counter()
+            for name, size in names:
+                assets.image(name, size)
+            print(f"{label:<20} {(time.perf_counter() - start) * 1000:7.2f} ms "
+                  f"({assets.disk_hits} hits, {assets.disk_misses} misses)")
+
+    raw = pygame.transform.scale(pygame.image.load(assets.resolve("egg.png")), (30, 40))
+    for label, surface in (("unconverted", raw), ("convert_alpha", raw.convert_alpha()),
+                           ("asset manager", assets.image("egg.png", (30, 40)))):
+        start = time.perf_counter()
+        for _ in range(20_000):
+            screen.blit(surface, (100, 100))
+        print(f"blit {label:<14} {(time.perf_counter() - start) / 20_000 * 1e6:7.2f} us")
@@ -0,0 +1,184 @@
+"""Struct-of-arrays ball storage and a uniform-grid broadphase.
+
+BallStore keeps x, y, dx and dy in preallocated NumPy arrays so pong can
+integrate, bounce and cull thousands of balls with a handful of array
+operations per tick. Removal is swap-remove: survivors from the tail fill
+the holes, so nothing shifts and order is not preserved.
+
+SpatialHash buckets balls into square cells and returns candidate pairs
+from the same and neighbouring cells, which collide_balls() turns into
+elastic ball-ball bounces.
+
+Running this module benchmarks one pong tick at increasing ball counts.
+"""
+
+import numpy as np
+
+
+class BallStore:
+    """Growable arrays of ball positions and velocities."""
+
+    FIELDS = ("x", "y", "dx", "dy")
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        for name in self.FIELDS:
+            setattr(self, "_" + name, np.zeros(capacity, dtype=np.float64))
+
+    def __len__(self):
+        return self.count
+
+    # Live views of the first `count` entries
+    @property
+    def x(self):
+        return self._x[:self.count]
+
+    @property
+    def y(self):
+        return self._y[:self.count]
+
+    @property
+    def dx(self):
+        return self._dx[:self.count]
+
+    @property
+    def dy(self):
+        return self._dy[:self.count]
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(self._x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, "_" + name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, "_" + name, new)
+
+    def add(self, x, y, dx, dy):
+        """Appends balls; each argument is a scalar or an array of equal length."""
+        x, y, dx, dy = np.broadcast_arrays(*(np.atleast_1d(v) for v in (x, y, dx, dy)))
+        n = len(x)
+        self._reserve(n)
+        end = self.count + n
+        self._x[self.count:end] = x
+        self._y[self.count:end] = y
+        self._dx[self.count:end] = dx
+        self._dy[self.count:end] = dy
+        self.count = end
+
+    def remove(self, mask):
+        """Swap-removes every ball where mask is True; returns how many were removed."""
+        dead = np.flatnonzero(mask)
+        if not len(dead):
+            return 0
+        keep = self.count - len(dead)
+        holes = dead[dead < keep]
+        survivors = keep + np.flatnonzero(~mask[keep:self.count])
+        for name in self.FIELDS:
+            array = getattr(self, "_" + name)
+            array[holes] = array[survivors]
+        self.count = keep
+        return len(dead)
+
+    def clear(self):
+        self.count = 0
+
+
+class SpatialHash:
+    """Uniform grid broadphase returning candidate pairs (i < j never repeated)."""
+
+    # The cell itself plus half of its neighbours, so each pair of
+    # neighbouring cells is visited once.
+    OFFSETS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+
+    def pairs(self, x, y):
+        """Returns index arrays (i, j) of balls in the same or adjacent cells."""
+        if len(x) < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        cx = np.floor(x / self.cell_size).astype(np.int64)
+        cy = np.floor(y / self.cell_size).astype(np.int64)
+        # Shift cells to non-negative ids so they pack into one int key
+        cx -= cx.min() - 1
+        cy -= cy.min() - 1
+        stride = cx.max() + 2
+        keys = cy * stride + cx
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        all_i, all_j = [], []
+        for ox, oy in self.OFFSETS:
+            target = keys + oy * stride + ox
+            start = np.searchsorted(sorted_keys, target, side="left")
+            end = np.searchsorted(sorted_keys, target, side="right")
+            counts = end - start
+            total = counts.sum()
+            if not total:
+                continue
+            i = np.repeat(np.arange(len(x)), counts)
+            first = np.repeat(start, counts)
+            run_start = np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[first + np.arange(total) - run_start]
+            if (ox, oy) == (0, 0):
+                keep = i < j
+                i, j = i[keep], j[keep]
+            all_i.append(i)
+            all_j.append(j)
+        if not all_i:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(all_i), np.concatenate(all_j)
+
+
+def collide_balls(balls, radius, grid=None):
+    """Bounces overlapping, approaching equal-mass balls off each other.
+
+    Returns the number of collisions resolved this call.
+    """
+    grid = grid or SpatialHash(2 * radius)
+    x, y, dx, dy = balls.x, balls.y, balls.dx, balls.dy
+    i, j = grid.pairs(x, y)
+    if not len(i):
+        return 0
+    nx = x[j] - x[i]
+    ny = y[j] - y[i]
+    distance_sq = nx * nx + ny * ny
+    closing = (dx[j] - dx[i]) * nx + (dy[j] - dy[i]) * ny
+    hit = (distance_sq < (2 * radius) ** 2) & (distance_sq > 0) & (closing < 0)
+    i, j, nx, ny = i[hit], j[hit], nx[hit], ny[hit]
+    if not len(i):
+        return 0
+    # Equal masses swap the velocity components along the contact normal
+    impulse = ((dx[j] - dx[i]) * nx + (dy[j] - dy[i]) * ny) / distance_sq[hit]
+    np.add.at(dx, i, impulse * nx)
+    np.add.at(dy, i, impulse * ny)
+    np.add.at(dx, j, -impulse * nx)
+    np.add.at(dy, j, -impulse * ny)
+    return len(i)
+
+
+if __name__ == "__main__":
+    import time
+
+    from arcade import PongSim
+
+    for count in (10, 100, 1000, 10_000, 50_000):
+        for collisions in (False, True):
+            sim = PongSim(seed=1, ball_collisions=collisions)
+            sim.add_random_balls(count - len(sim.balls))
+            sim.lives = 10 ** 9  # keep playing while balls fall out
+            ticks = 200
+            start = time.perf_counter()
+            for _ in range(ticks):
+                sim.step()
+            per_tick = (time.perf_counter() - start) / ticks
+            label = "with" if collisions else "without"
+            print(f"{count:>6} balls {label:>7} ball-ball collisions: "
+                  f"{per_tick * 1000:7.3f} ms/tick ({len(sim.balls)} balls at end)")
@@ -0,0 +1,353 @@
+"""Vectorized NumPy simulator for many 2048 boards at once.
+
+N boards live in one (N, size, size) array and every move, merge, spawn and
+game-over check runs as array operations over all of them. The rules of
+each variant are a pluggable kernel:
+
+    ClassicKernel      - ClassicGame (4x4, spawns 2 or 4)
+    AdaptiveKernel     - AdaptiveGame (spawn follows the highest tile)
+    TripleMergeKernel  - TripleMergeGame (triple merges, 2-3 spawns)
+
+Spawns use a vectorized SplitMix64 that draws exactly like the scalar
+game2048 rng, so board i seeded with seeds[i] plays the same game as
+game2048 with that seed, given the same directions.
+
+legal_moves() gives an (N, 4) mask of the directions that change each
+board from a few neighbour comparisons. It decides game over, and slide()
+uses it to skip boards whose move would change nothing instead of sorting
+and merging their rows. Running this module benchmarks it on full boards.
+"""
+
+import numpy as np
+
+from bitboard import DIRECTIONS
+
+LEFT, RIGHT, UP, DOWN = range(4)
+
+
+class BatchSplitMix64:
+    """SplitMix64 with one state per board; only masked boards advance."""
+
+    GAMMA = np.uint64(0x9E3779B97F4A7C15)
+    MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+    MUL2 = np.uint64(0x94D049BB133111EB)
+
+    def __init__(self, seeds):
+        self.state = np.array([seed & ((1 << 64) - 1) for seed in seeds], dtype=np.uint64)
+
+    def random(self, mask):
+        """Returns one float in [0, 1) per board (0.0 where mask is False)."""
+        state = np.where(mask, self.state + self.GAMMA, self.state)
+        self.state = state
+        z = state
+        z = (z ^ (z >> np.uint64(30))) * self.MUL1
+        z = (z ^ (z >> np.uint64(27))) * self.MUL2
+        z = z ^ (z >> np.uint64(31))
+        return np.where(mask, (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53)), 0.0)
+
+
+def compact_rows(rows):
+    """Slides the non-zero cells of every row to the left, keeping order."""
+    order = np.argsort(rows == 0, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1)
+
+
+def nth_empty_cell(empty, n):
+    """Returns the flat index of the n-th empty cell of every board."""
+    return np.argmax(np.cumsum(empty, axis=1) > n[:, None], axis=1)
+
+
+class ClassicKernel:
+    """Pair merges on log2 exponents; one 2 (90%) or 4 spawn per move."""
+
+    size = 4
+    dtype = np.uint8
+    initial_spawns = 2
+
+    def encode(self, values):
+        values = np.asarray(values, dtype=np.int64)
+        exponents = np.zeros(values.shape, dtype=self.dtype)
+        nonzero = values > 0
+        exponents[nonzero] = np.log2(values[nonzero]).astype(self.dtype)
+        return exponents
+
+    def decode(self, cells):
+        return np.where(cells > 0, np.left_shift(1, cells.astype(np.int64)), 0)
+
+    def merge_rows(self, rows):
+        """Merges compacted rows in place; returns the score per row."""
+        score = np.zeros(len(rows), dtype=np.int64)
+        for c in range(rows.shape[1] - 1):
+            pair = (rows[:, c] != 0) & (rows[:, c] == rows[:, c + 1])
+            rows[pair, c] += 1
+            rows[pair, c + 1] = 0
+            score[pair] += np.left_shift(1, rows[pair, c].astype(np.int64))
+        return score
+
+    def new_tile_values(self, sim, roll):
+        return np.where(roll < 0.9, 1, 2).astype(self.dtype)
+
+    def add_new_tiles(self, sim, mask):
+        """Adds one tile per masked board (if it has an empty cell)."""
+        flat = sim.boards.reshape(sim.n, -1)
+        empty = flat == 0
+        mask = mask & empty.any(axis=1)
+        n_empty = empty.sum(axis=1)
+        pick = (sim.rng.random(mask) * n_empty).astype(np.int64)
+        index = nth_empty_cell(empty, pick)
+        values = self.new_tile_values(sim, sim.rng.random(mask))
+        rows = np.nonzero(mask)[0]
+        flat[rows, index[rows]] = values[rows]
+
+    def spawn_after_move(self, sim, moved, directions):
+        self.add_new_tiles(sim, moved)
+
+    def legal_moves(self, boards):
+        """Returns an (N, 4) bool array: True where a direction changes the board.
+
+        A row changes if a tile has an empty cell on the side it moves to or
+        two equal tiles touch (three equal tiles always include two that do).
+        """
+        legal = np.empty((len(boards), 4), dtype=bool)
+        for axis, first in ((2, LEFT), (1, UP)):
+            near = boards[:, :, :-1] if axis == 2 else boards[:, :-1, :]
+            far = boards[:, :, 1:] if axis == 2 else boards[:, 1:, :]
+            near_empty, far_empty = near == 0, far == 0
+            merge = ((near == far) & ~far_empty).any(axis=(1, 2))
+            legal[:, first] = merge | (near_empty & ~far_empty).any(axis=(1, 2))
+            legal[:, first + 1] = merge | (far_empty & ~near_empty).any(axis=(1, 2))
+        return legal
+
+    def can_move(self, boards):
+        """Returns True for every board that still has a legal move."""
+        return self.legal_moves(boards).any(axis=1)
+
+
+class AdaptiveKernel(ClassicKernel):
+    """AdaptiveGame rules: spawn value follows the highest tile, spawn only on a new direction."""
+
+    size = 8
+
+    # (highest exponent, spawned exponent) from AdaptiveGame.SPAWN_STEPS
+    SPAWN_STEPS = tuple(
+        (threshold.bit_length() - 1, value.bit_length() - 1)
+        for threshold, value in (
+            (16384, 4096), (8192, 2048), (4096, 1024), (2048, 512), (1024, 256),
+            (512, 128), (256, 64), (128, 32), (64, 16), (32, 8),
+        )
+    )
+
+    def __init__(self, size=None):
+        if size is not None:
+            self.size = size
+
+    def new_tile_values(self, sim, roll):
+        highest = sim.boards.reshape(sim.n, -1).max(axis=1)
+        values = np.where(roll < 0.9, 1, 2).astype(self.dtype)
+        for threshold, value in reversed(self.SPAWN_STEPS):
+            values[highest >= threshold] = value
+        return values
+
+    def spawn_after_move(self, sim, moved, directions):
+        spawn = moved & (sim.last_direction != directions)
+        self.add_new_tiles(sim, spawn)
+        sim.last_direction[spawn] = directions[spawn]
+
+
+class TripleMergeKernel(ClassicKernel):
+    """TripleMergeGame rules on raw tile values: triple merges, 2-3 spawns of 2 or 4."""
+
+    size = 8
+    dtype = np.int64
+    initial_spawns = 1
+
+    def encode(self, values):
+        return np.asarray(values, dtype=self.dtype)
+
+    def decode(self, cells):
+        return cells.copy()
+
+    def merge_rows(self, rows):
+        score = np.zeros(len(rows), dtype=np.int64)
+        width = rows.shape[1]
+        for c in range(width - 1):
+            live = rows[:, c] != 0
+            if c < width - 2:
+                triple = live & (rows[:, c] == rows[:, c + 1]) & (rows[:, c] == rows[:, c + 2])
+                rows[triple, c] *= 3
+                rows[triple, c + 1] = 0
+                rows[triple, c + 2] = 0
+                score[triple] += rows[triple, c]
+            else:
+                triple = np.zeros(len(rows), dtype=bool)
+            pair = live & ~triple & (rows[:, c] == rows[:, c + 1])
+            rows[pair, c] *= 2
+            rows[pair, c + 1] = 0
+            score[pair] += rows[pair, c]
+        return score
+
+    def add_new_tiles(self, sim, mask):
+        """Adds 2-3 tiles per masked board that has an empty cell."""
+        flat = sim.boards.reshape(sim.n, -1)
+        mask = mask & (flat == 0).any(axis=1)
+        count = 2 + (sim.rng.random(mask) * 2).astype(np.int64)
+        for t in range(3):
+            empty = flat == 0
+            n_empty = empty.sum(axis=1)
+            active = mask & (t < count) & (n_empty > 0)
+            pick = (sim.rng.random(active) * n_empty).astype(np.int64)
+            index = nth_empty_cell(empty, pick)
+            values = np.where(sim.rng.random(active) < 0.5, 2, 4)
+            rows = np.nonzero(active)[0]
+            flat[rows, index[rows]] = values[rows]
+
+
+KERNELS = {
+    "classic": ClassicKernel,
+    "adaptive": AdaptiveKernel,
+    "triple": TripleMergeKernel,
+}
+
+
+class BatchSimulator:
+    """N independent boards of one variant, stepped together."""
+
+    def __init__(self, kernel, seeds):
+        self.kernel = kernel
+        self.seeds = list(seeds)
+        self.n = len(self.seeds)
+        self.reset()
+
+    def reset(self):
+        """Clears every board and places the starting tiles."""
+        size = self.kernel.size
+        self.rng = BatchSplitMix64(self.seeds)
+        self.boards = np.zeros((self.n, size, size), dtype=self.kernel.dtype)
+        self.scores = np.zeros(self.n, dtype=np.int64)
+        self.moves = np.zeros(self.n, dtype=np.int64)
+        self.last_direction = np.full(self.n, -1, dtype=np.int8)
+        everyone = np.ones(self.n, dtype=bool)
+        for _ in range(self.kernel.initial_spawns):
+            self.kernel.add_new_tiles(self, everyone)
+        self._legal = None
+
+    def reset_boards(self, mask):
+        """Starts a new game on the masked boards; their rngs carry on where they were."""
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.moves[mask] = 0
+        self.last_direction[mask] = -1
+        for _ in range(self.kernel.initial_spawns):
+            self.kernel.add_new_tiles(self, mask)
+        if self._legal is not None:
+            self._legal[mask] = self.kernel.legal_moves(self.boards[mask])
+
+    @property
+    def grids(self):
+        """Tile values as an (N, size, size) int64 array."""
+        return self.kernel.decode(self.boards)
+
+    def get_highest_tiles(self):
+        return self.kernel.decode(self.boards).reshape(self.n, -1).max(axis=1)
+
+    def legal_moves(self):
+        """Returns the (N, 4) legal direction mask of the current boards (cached until they change)."""
+        if self._legal is None:
+            self._legal = self.kernel.legal_moves(self.boards)
+        return self._legal
+
+    def _oriented(self, boards, direction):
+        """Views boards so that `direction` becomes a left move."""
+        if direction == RIGHT:
+            return boards[:, :, ::-1]
+        if direction == UP:
+            return boards.transpose(0, 2, 1)
+        if direction == DOWN:
+            return boards.transpose(0, 2, 1)[:, :, ::-1]
+        return boards
+
+    def slide(self, directions, mask=None):
+        """Moves every board in its direction without spawning.
+
+        directions is one direction index (see DIRECTIONS) or one per board.
+        Returns a bool array of the boards that changed.
+        """
+        directions = np.broadcast_to(np.asarray(directions), (self.n,))
+        # Boards whose move changes nothing are left alone
+        moved = self.legal_moves()[np.arange(self.n), directions]
+        if mask is not None:
+            moved &= mask
+        size = self.kernel.size
+        for direction in range(len(DIRECTIONS)):
+            selected = np.nonzero(moved & (directions == direction))[0]
+            if not len(selected):
+                continue
+            before = self.boards[selected]
+            rows = compact_rows(self._oriented(before, direction).reshape(-1, size))
+            gained = self.kernel.merge_rows(rows).reshape(len(selected), size).sum(axis=1)
+            rows = compact_rows(rows)
+            after = np.empty_like(before)
+            self._oriented(after, direction)[...] = rows.reshape(len(selected), size, size)
+            self.boards[selected] = after
+            self.scores[selected] += gained
+        self.moves += moved
+        self._legal = None
+        return moved
+
+    def move(self, directions, mask=None):
+        """Plays one turn on every board: slide, then spawn per the kernel's rules."""
+        directions = np.broadcast_to(np.asarray(directions), (self.n,))
+        moved = self.slide(directions, mask)
+        self.kernel.spawn_after_move(self, moved, directions)
+        self._legal = None
+        return moved
+
+    def check_game_over(self):
+        """Returns a bool array of the boards with no legal move left."""
+        return ~self.legal_moves().any(axis=1)
+
+    def run(self, policy, max_moves=None):
+        """Plays every board to game over; policy(sim) returns directions per board."""
+        done = self.check_game_over()
+        turns = 0
+        while not done.all() and (max_moves is None or turns < max_moves):
+            self.move(policy(self), ~done)
+            done |= self.check_game_over()
+            turns += 1
+        return done
+
+
+def _benchmark(n=8192, repeats=5):
+    import time
+
+    rng = np.random.default_rng(0)
+    print(f"{'variant':<10} {'boards':>7} {'four slides':>12} {'legal_moves':>12}")
+    for name, kernel in KERNELS.items():
+        sim = BatchSimulator(kernel(), range(n))
+        # Full boards, every cell a tile; a quarter are game-over checkerboards
+        size = sim.kernel.size
+        values = 2 ** rng.integers(1, 8, size=(n, size, size))
+        checker = np.where(np.indices((size, size)).sum(axis=0) % 2, 2, 4)
+        values[: n // 4] = checker
+        full = sim.kernel.encode(values)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            by_slides = np.empty((n, 4), dtype=bool)
+            for direction in range(4):
+                sim.boards = full.copy()
+                sim._legal = np.ones((n, 4), dtype=bool)  # Make slide() try every board
+                sim.slide(direction)
+                by_slides[:, direction] = (sim.boards != full).any(axis=(1, 2))
+        slides_time = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            legal = sim.kernel.legal_moves(full)
+        legal_time = (time.perf_counter() - start) / repeats
+        assert (legal == by_slides).all()
+        print(f"{name:<10} {n:>7} {slides_time * 1000:>9.1f} ms {legal_time * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
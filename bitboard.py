@@ -0,0 +1,408 @@
+"""Packed-integer 2048 boards with precomputed row move tables.
+
+A board is a single Python int. Every cell holds the log2 exponent of its
+tile in `bits` bits (0 means empty), cells are stored row by row starting
+from the lowest bits, so cell (r, c) lives at bit (r * size + c) * bits.
+A whole move is one table lookup per row plus two transposes for the
+vertical directions.
+
+move_trail() reports where each tile of a move went, for animating it,
+from a second row table that is filled in as rows are first seen.
+
+legal_mask() answers "which directions change the board" from a third
+table of per-row can-move bits (1 = left, 2 = right), one lookup per row
+and column with no move computed, so game-over checks and move pruning
+stay cheap on full boards. Running this module benchmarks it.
+"""
+
+import functools
+
+DIRECTIONS = ("left", "right", "up", "down")
+# The directions in each 4-bit legal mask (bit i = DIRECTIONS[i])
+MASK_DIRECTIONS = tuple(tuple(d for i, d in enumerate(DIRECTIONS) if mask >> i & 1) for mask in range(16))
+
+
+def slide_row(cells):
+    """Slides a row of exponents to the left and merges equal pairs.
+
+    Returns (new_cells, score) using the same rules as move_left in the
+    pygame games: each tile merges at most once, from left to right.
+    """
+    tiles = [x for x in cells if x]
+    merged = []
+    score = 0
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+            merged.append(tiles[i] + 1)
+            score += 1 << (tiles[i] + 1)
+            i += 2
+        else:
+            merged.append(tiles[i])
+            i += 1
+    return merged + [0] * (len(cells) - len(merged)), score
+
+
+def slide_row_moves(cells):
+    """Where slide_row() sends each tile: [(src, dst, exponent, merged)].
+
+    merged is the exponent the tile merges into, or 0 if it only slides.
+    Both tiles of a merge are listed (the one that stays has src == dst);
+    tiles that neither move nor merge are left out.
+    """
+    tiles = [(c, x) for c, x in enumerate(cells) if x]
+    moves = []
+    i = dst = 0
+    while i < len(tiles):
+        src, x = tiles[i]
+        if i + 1 < len(tiles) and x == tiles[i + 1][1]:
+            moves.append((src, dst, x, x + 1))
+            moves.append((tiles[i + 1][0], dst, x, x + 1))
+            i += 2
+        else:
+            if src != dst:
+                moves.append((src, dst, x, 0))
+            i += 1
+        dst += 1
+    return moves
+
+
+class _LazyRowTable(dict):
+    """Bounded row table that fills itself in on first use (for wide rows).
+
+    The tables are shared by every game in the process, so they must not
+    grow with the number of games played. Entries live in two generations:
+    once `capacity` rows are cached, the current ones become the old
+    generation and the previous old one is dropped. A row found in the old
+    generation is moved back into the current one, so rows still in use
+    survive (an approximate LRU) while hits stay plain dict lookups.
+    """
+
+    def __init__(self, build, capacity=1 << 15):
+        super().__init__()
+        self._build = build
+        self.capacity = capacity
+        self._old = {}
+
+    def __missing__(self, row):
+        entry = self._old.pop(row, None)
+        if entry is None:
+            entry = self._build(row)
+        if len(self) >= self.capacity:
+            self._old = dict(self)
+            self.clear()
+        self[row] = entry
+        return entry
+
+    def cached(self):
+        """Number of rows held in both generations."""
+        return len(self) + len(self._old)
+
+
+class Bitboard:
+    """Move/merge tables for a size x size board packed into one int."""
+
+    # Rows up to this many bits get a fully precomputed table; wider rows
+    # (the 8x8 board, 5-bit cells) are memoized as they are first seen, in
+    # bounded tables.
+    FULL_TABLE_BITS = 16
+
+    def __init__(self, size=4, bits=4):
+        self.size = size
+        self.bits = bits
+        self.cell_mask = (1 << bits) - 1
+        self.max_exponent = self.cell_mask
+        self.row_bits = size * bits
+        self.row_mask = (1 << self.row_bits) - 1
+        self.cells = size * size
+
+        if self.row_bits <= self.FULL_TABLE_BITS:
+            self.rows = [self._build_row(row) for row in range(1 << self.row_bits)]
+            self.legal = bytes(self._build_legal(row) for row in range(1 << self.row_bits))
+        else:
+            self.rows = _LazyRowTable(self._build_row)
+            self.legal = _LazyRowTable(self._build_legal)
+
+        self._transpose_steps = self._build_transpose_steps()
+        # Only the rows a game actually moves are ever looked up here
+        self.trails = _LazyRowTable(self._build_trail)
+
+    # --- table construction -------------------------------------------------
+
+    def _row_to_cells(self, row):
+        return [(row >> (c * self.bits)) & self.cell_mask for c in range(self.size)]
+
+    def _cells_to_row(self, cells):
+        row = 0
+        for c, exponent in enumerate(cells):
+            row |= exponent << (c * self.bits)
+        return row
+
+    def _build_row(self, row):
+        """Returns (left_result, right_result, score) for one packed row."""
+        cells = self._row_to_cells(row)
+        left, score = slide_row(cells)
+        right, _ = slide_row(cells[::-1])
+        # Merging two max-exponent tiles would spill into the next cell; -1
+        # makes the packed result negative so move() can report it.
+        if max(left) > self.max_exponent:
+            return -1, -1, score
+        return self._cells_to_row(left), self._cells_to_row(right[::-1]), score
+
+    def _build_legal(self, row):
+        """Can-move bits of one packed row: 1 if left changes it, 2 if right does."""
+        left, right, _ = self.rows[row]
+        # An overflowing merge (-1) still changes the row
+        return (left != row) | (right != row) << 1
+
+    def _build_trail(self, row):
+        """Returns the (left, right) tile moves of one packed row, with tile values."""
+        cells = self._row_to_cells(row)
+        last = self.size - 1
+        left = [(src, dst, 1 << x, 1 << merged if merged else 0)
+                for src, dst, x, merged in slide_row_moves(cells)]
+        right = [(last - src, last - dst, 1 << x, 1 << merged if merged else 0)
+                 for src, dst, x, merged in slide_row_moves(cells[::-1])]
+        return left, right
+
+    def _build_transpose_steps(self):
+        """Delta-swap masks that transpose the board (size must be a power of 2)."""
+        if self.size & (self.size - 1):
+            raise ValueError("Bitboard size must be a power of two")
+        steps = []
+        block = self.size // 2
+        while block:
+            mask = 0
+            for r in range(self.size):
+                for c in range(self.size):
+                    if (r % (2 * block)) < block and (c % (2 * block)) >= block:
+                        mask |= self.cell_mask << ((r * self.size + c) * self.bits)
+            shift = (block * self.size - block) * self.bits
+            steps.append((shift, mask))
+            block //= 2
+        return steps
+
+    # --- packing ------------------------------------------------------------
+
+    def pack(self, grid):
+        """Packs a list-of-lists grid of tile values into an int."""
+        board = 0
+        for r, row in enumerate(grid):
+            for c, value in enumerate(row):
+                if value:
+                    exponent = value.bit_length() - 1
+                    if value != 1 << exponent or exponent > self.max_exponent:
+                        raise ValueError(f"Cannot pack tile value {value}")
+                    board |= exponent << ((r * self.size + c) * self.bits)
+        return board
+
+    def unpack(self, board):
+        """Unpacks an int board into a list-of-lists grid of tile values."""
+        grid = []
+        for r in range(self.size):
+            row = []
+            for c in range(self.size):
+                exponent = (board >> ((r * self.size + c) * self.bits)) & self.cell_mask
+                row.append(1 << exponent if exponent else 0)
+            grid.append(row)
+        return grid
+
+    def get(self, board, index):
+        """Returns the tile value at cell index r * size + c."""
+        exponent = (board >> (index * self.bits)) & self.cell_mask
+        return 1 << exponent if exponent else 0
+
+    def set(self, board, index, value):
+        """Returns board with the tile at cell index replaced by value."""
+        shift = index * self.bits
+        exponent = value.bit_length() - 1 if value else 0
+        return (board & ~(self.cell_mask << shift)) | (exponent << shift)
+
+    def empty_cells(self, board):
+        """Returns the indices of all empty cells in row-major order."""
+        return [i for i in range(self.cells) if not (board >> (i * self.bits)) & self.cell_mask]
+
+    def highest_tile(self, board):
+        """Returns the highest tile value on the board."""
+        exponent = 0
+        while board:
+            exponent = max(exponent, board & self.cell_mask)
+            board >>= self.bits
+        return 1 << exponent if exponent else 0
+
+    # --- moves --------------------------------------------------------------
+
+    def transpose(self, board):
+        for shift, mask in self._transpose_steps:
+            t = (board ^ (board >> shift)) & mask
+            board ^= t ^ (t << shift)
+        return board
+
+    def _move_rows(self, board, which):
+        rows = self.rows
+        result = 0
+        score = 0
+        for r in range(self.size):
+            shift = r * self.row_bits
+            entry = rows[(board >> shift) & self.row_mask]
+            result |= entry[which] << shift
+            score += entry[2]
+        if result < 0:
+            raise OverflowError(
+                f"Tile exceeds {1 << self.max_exponent}; "
+                f"use a Bitboard with more than {self.bits} bits per cell"
+            )
+        return result, score
+
+    def move_left(self, board):
+        """Returns (new_board, score_gained) after a left move."""
+        return self._move_rows(board, 0)
+
+    def move_right(self, board):
+        return self._move_rows(board, 1)
+
+    def move_up(self, board):
+        result, score = self._move_rows(self.transpose(board), 0)
+        return self.transpose(result), score
+
+    def move_down(self, board):
+        result, score = self._move_rows(self.transpose(board), 1)
+        return self.transpose(result), score
+
+    def legal_mask(self, board):
+        """Returns the directions that change the board as bits (1 << DIRECTIONS index)."""
+        legal = self.legal
+        row_bits, row_mask = self.row_bits, self.row_mask
+        horizontal = vertical = 0
+        for r in range(self.size):
+            horizontal |= legal[(board >> (r * row_bits)) & row_mask]
+            if horizontal == 3:
+                break
+        columns = self.transpose(board)
+        for r in range(self.size):
+            vertical |= legal[(columns >> (r * row_bits)) & row_mask]
+            if vertical == 3:
+                break
+        return horizontal | vertical << 2
+
+    def legal_directions(self, board):
+        """Returns the directions that change the board, in DIRECTIONS order."""
+        return MASK_DIRECTIONS[self.legal_mask(board)]
+
+    def legal_moves(self, board):
+        """Returns [(direction, new_board, score_gained)] for the moves that change the board.
+
+        Only the legal moves are computed, and up/down share the transpose
+        the mask needed.
+        """
+        legal = self.legal
+        row_bits, row_mask = self.row_bits, self.row_mask
+        moves = []
+        horizontal = 0
+        for r in range(self.size):
+            horizontal |= legal[(board >> (r * row_bits)) & row_mask]
+            if horizontal == 3:
+                break
+        if horizontal & 1:
+            moves.append(("left",) + self._move_rows(board, 0))
+        if horizontal & 2:
+            moves.append(("right",) + self._move_rows(board, 1))
+        columns = self.transpose(board)
+        vertical = 0
+        for r in range(self.size):
+            vertical |= legal[(columns >> (r * row_bits)) & row_mask]
+            if vertical == 3:
+                break
+        for bit, direction, which in ((1, "up", 0), (2, "down", 1)):
+            if vertical & bit:
+                result, score = self._move_rows(columns, which)
+                moves.append((direction, self.transpose(result), score))
+        return moves
+
+    def move(self, board, direction):
+        """Applies a move by name ("left", "right", "up" or "down")."""
+        if direction == "left":
+            return self.move_left(board)
+        if direction == "right":
+            return self.move_right(board)
+        if direction == "up":
+            return self.move_up(board)
+        if direction == "down":
+            return self.move_down(board)
+        raise ValueError(f"Unknown direction: {direction!r}")
+
+    def move_trail(self, board, direction):
+        """Lists the tiles a move slides or merges as (src, dst, value, merged).
+
+        src and dst are cell indices r * size + c, value is the tile's value
+        and merged the value it merges into at dst (0 if it only slides).
+        Tiles that stay put unmerged are left out.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction!r}")
+        vertical = direction in ("up", "down")
+        which = direction in ("right", "down")
+        if vertical:
+            board = self.transpose(board)
+        size = self.size
+        trails = self.trails
+        moves = []
+        for r in range(size):
+            row = (board >> (r * self.row_bits)) & self.row_mask
+            if not row:
+                continue
+            for src, dst, value, merged in trails[row][which]:
+                if vertical:
+                    moves.append((src * size + r, dst * size + r, value, merged))
+                else:
+                    moves.append((r * size + src, r * size + dst, value, merged))
+        return moves
+
+    def move_grid(self, grid, direction):
+        """Moves a list-of-lists grid; returns (new_grid, score_gained)."""
+        board, score = self.move(self.pack(grid), direction)
+        return self.unpack(board), score
+
+
+@functools.lru_cache(maxsize=None)
+def get_bitboard(size=4, bits=4):
+    """Returns the shared Bitboard tables for a board size."""
+    return Bitboard(size, bits)
+
+
+def _benchmark(boards=2000):
+    import random
+    import time
+
+    rng = random.Random(1)
+    print(f"{'board':<16} {'four moves':>11} {'legal_mask':>11} {'legal_moves':>12}")
+    for size, bits in ((4, 4), (8, 5)):
+        tables = get_bitboard(size, bits)
+        # Full boards: every cell holds a tile, so only merges can move
+        full = [tables.pack([[1 << rng.randint(1, 10) for _ in range(size)] for _ in range(size)])
+                for _ in range(boards)]
+        # Game-over boards: a checkerboard of 2s and 4s
+        stuck = tables.pack([[2 if (r + c) % 2 else 4 for c in range(size)] for r in range(size)])
+        for name, batch in (("full", full), ("game over", [stuck] * boards)):
+            for board in batch:  # Fill the lazy 8x8 tables first
+                tables.legal_moves(board)
+                for direction in DIRECTIONS:
+                    tables.move(board, direction)
+            start = time.perf_counter()
+            by_moves = [[(d,) + tables.move(board, d) for d in DIRECTIONS] for board in batch]
+            by_moves = [[move for move in moves if move[1] != board] for board, moves in zip(batch, by_moves)]
+            moves_time = time.perf_counter() - start
+            start = time.perf_counter()
+            by_mask = [tables.legal_mask(board) for board in batch]
+            mask_time = time.perf_counter() - start
+            start = time.perf_counter()
+            pruned = [tables.legal_moves(board) for board in batch]
+            pruned_time = time.perf_counter() - start
+            assert pruned == by_moves
+            assert [MASK_DIRECTIONS[mask] for mask in by_mask] == [tuple(m[0] for m in moves) for moves in by_moves]
+            print(f"{size}x{size} {name:<12} {moves_time / boards * 1e6:8.2f} us "
+                  f"{mask_time / boards * 1e6:8.2f} us {pruned_time / boards * 1e6:9.2f} us")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -1,11 +1,17 @@
 import pygame
-import random
+from arcade import EggSim, lerp
+from assets import AssetManager
+from gameloop import FixedTimestepLoop
+from profiler import profiler_from_env
+from replay import GAMES, LEFT, RIGHT, RESTART, recorder_from_env
+from spritebatch import SpriteBatch
+from textcache import render_text
 
 # Initialize Pygame
 pygame.init()
 
 # Screen settings
-WIDTH, HEIGHT = 600, 400
+WIDTH, HEIGHT = EggSim.WIDTH, EggSim.HEIGHT
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Catching the Egg Game")
 
@@ -15,128 +21,88 @@ BLACK = (0, 0, 0)
 RED = (200, 0, 0)
 GREEN = (0, 200, 0)
 
-# Load images
+# Load images, resized and converted to the display format (cached on disk)
+assets = AssetManager()
 try:
-    basket_img = pygame.image.load("basket.png")
-    egg_img = pygame.image.load("egg.png")
-    hen_img = pygame.image.load("hen.png")
-
-    # Resize images
-    basket_img = pygame.transform.scale(basket_img, (80, 50))
-    egg_img = pygame.transform.scale(egg_img, (30, 40))
-    hen_img = pygame.transform.scale(hen_img, (60, 60))
-except pygame.error as e:
+    basket_img = assets.image("basket.png", (80, 50))
+    egg_img = assets.image("egg.png", (30, 40))
+    hen_img = assets.image("hen.png", (60, 60))
+except (pygame.error, FileNotFoundError) as e:
     print(f"Error loading images: {e}")
     exit()
 
-# Basket class
-class Basket:
-    def __init__(self):
-        self.x = WIDTH // 2
-        self.y = HEIGHT - 60
-        self.speed = 8
-
-    def move(self, direction):
-        if direction == "LEFT" and self.x > 0:
-            self.x -= self.speed
-        if direction == "RIGHT" and self.x < WIDTH - 80:
-            self.x += self.speed
-
-    def draw(self):
-        screen.blit(basket_img, (self.x, self.y))
-
-# Egg class
-class Egg:
-    def __init__(self):
-        self.x = random.randint(50, WIDTH - 50)
-        self.y = 70
-        self.speed = random.randint(3, 6)
-
-    def fall(self):
-        self.y += self.speed
-
-    def draw(self):
-        screen.blit(egg_img, (self.x, self.y))
+# Sprite batches: one blits() call for all hens and one for all eggs
+hen_sprites = SpriteBatch(hen_img)
+egg_sprites = SpriteBatch(egg_img)
 
 # Game variables
-basket = Basket()
-eggs = []
-hens = [(50, 20), (250, 20), (450, 20)]  # Hen positions
-score = 0
-lives = 3
+recorder = recorder_from_env("egg")  # Set GAME_REPLAY=file to record
+sim = EggSim(recorder.seed)
+step = GAMES["egg"].step
+held = {"left": False, "right": False, "restart": False}  # Keys for the next tick
 clock = pygame.time.Clock()
+profiler = profiler_from_env()
 
-# Game loop
-running = True
-while running:
-    screen.fill(WHITE)
-
-    # Draw hens
-    for hx, hy in hens:
-        screen.blit(hen_img, (hx, hy))
-
-    # Handle events
+def handle_events():
+    """Collects input for the next tick; returns False when the window closes."""
     for event in pygame.event.get():
+        profiler.handle_event(event)
         if event.type == pygame.QUIT:
-            running = False
+            return False
+        # Wait for restart
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r and sim.game_over:
+            held["restart"] = True
 
     # Move basket with keys
     keys = pygame.key.get_pressed()
-    if keys[pygame.K_LEFT]:
-        basket.move("LEFT")
-    if keys[pygame.K_RIGHT]:
-        basket.move("RIGHT")
-
-    # Spawn eggs randomly
-    if random.randint(1, 100) > 98:
-        eggs.append(Egg())
-
-    # Move and draw eggs
-    for egg in eggs[:]:
-        egg.fall()
-        egg.draw()
-
-        # Check if egg is caught
-        if basket.x < egg.x < basket.x + 80 and basket.y < egg.y < basket.y + 40:
-            eggs.remove(egg)
-            score += 1
-
-        # Check if egg is missed
-        elif egg.y > HEIGHT:
-            eggs.remove(egg)
-            lives -= 1
-
-    # Draw basket
-    basket.draw()
-
-    # Display score & lives
-    font = pygame.font.Font(None, 36)
-    score_text = font.render(f"Score: {score}", True, BLACK)
-    lives_text = font.render(f"Lives: {lives}", True, RED)
-    screen.blit(score_text, (10, 10))
-    screen.blit(lives_text, (WIDTH - 100, 10))
+    held["left"] = keys[pygame.K_LEFT]
+    held["right"] = keys[pygame.K_RIGHT]
+    return True
 
+def update(dt):
+    code = LEFT * held["left"] | RIGHT * held["right"] | RESTART * held["restart"]
+    recorder.record(code)
+    step(sim, code)
+    held["restart"] = False
+
+def render(alpha):
     # Game over condition
-    if lives <= 0:
+    if sim.game_over:
+        with profiler.phase("text"):
+            screen.fill(WHITE)
+            game_over_text = render_text("Game Over! Press R to Restart", 36, RED)
+            screen.blit(game_over_text, (WIDTH // 2 - 150, HEIGHT // 2))
+        with profiler.phase("flip"):
+            pygame.display.flip()
+        return
+
+    with profiler.phase("draw"):
         screen.fill(WHITE)
-        game_over_text = font.render("Game Over! Press R to Restart", True, RED)
-        screen.blit(game_over_text, (WIDTH // 2 - 150, HEIGHT // 2))
+
+        # Draw hens
+        hen_sprites.draw(screen, [hx for hx, _ in sim.hens], [hy for _, hy in sim.hens])
+
+        # Draw eggs
+        egg_sprites.draw(screen, [egg.x for egg in sim.eggs], [sim.egg_y(egg, alpha) for egg in sim.eggs])
+
+        # Draw basket
+        screen.blit(basket_img, (lerp(sim.prev_basket_x, sim.basket_x, alpha), sim.basket_y))
+
+    with profiler.phase("text"):
+        # Display score & lives
+        score_text = render_text(f"Score: {sim.score}", 36, BLACK)
+        lives_text = render_text(f"Lives: {sim.lives}", 36, RED)
+        screen.blit(score_text, (10, 10))
+        screen.blit(lives_text, (WIDTH - 100, 10))
+
+    profiler.draw_overlay(screen)
+    with profiler.phase("flip"):
         pygame.display.flip()
 
-        # Wait for restart
-        restart = False
-        while not restart:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    restart = True
-                    score = 0
-                    lives = 3
-                    eggs.clear()
-
-    pygame.display.flip()
-    clock.tick(30)
+# Game loop: physics at a fixed 30 ticks a second, drawing up to 60 fps
+loop = FixedTimestepLoop(update, render, EggSim.TICK_RATE, handle_events,
+                         frame_limiter=lambda: clock.tick(60), profiler=profiler)
+loop.run()
+recorder.close(sim)
 
 pygame.quit()
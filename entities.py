@@ -0,0 +1,149 @@
+"""Pooled entity storage for the arcade simulations.
+
+Eggs and pipes used to be dicts: every spawn built a new dict, removal
+was list.remove() while iterating a copy of the list, and pipes were
+popped off the front of a list. Here entities are small __slots__
+objects that are allocated once and reused:
+
+    EntityPool  preallocated entities in one list: the live ones first,
+                in spawn order, then the free-list. spawn() takes the
+                first free one; release() marks one dead and compact()
+                moves the dead ones back to the free-list in place,
+                keeping the live ones in order.
+
+Pipes scroll through a fixed ring (collections.deque): the pipe leaving
+the screen is rotated to the back and reused as the new one.
+
+Positions that change every tick are floats: CPython recycles float
+objects through a free-list, whereas ints above 256 are fresh heap
+objects. The per-tick loops index the pool and the pipe ring with while
+loops instead of creating iterators. At steady state a tick therefore
+allocates nothing in arcade.py or here that outlives it. Running this
+module checks that with tracemalloc snapshots filtered to those two files
+(any bytes kept there fail the run) and prints the bytes a tick still
+allocates and frees elsewhere: CPython's own temporaries, such as the ints
+above 256 for the counters and the rng calls of a spawn.
+"""
+
+from itertools import islice
+
+
+class Egg:
+    __slots__ = ("x", "y", "speed", "alive")
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0.0
+        self.speed = 0
+        self.alive = False
+
+
+class Pipe:
+    __slots__ = ("x", "top", "bottom")
+
+    def __init__(self):
+        self.x = 0.0
+        self.top = 0
+        self.bottom = 0
+
+
+class EntityPool:
+    """Fixed-size store of reusable entities with a free-list.
+
+    live[:count] are in use in spawn order; live[count:] are free. The pool
+    only grows (doubling) if more entities are alive at once than ever before.
+    """
+
+    def __init__(self, factory, capacity=16):
+        self.factory = factory
+        self.live = [factory() for _ in range(capacity)]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return islice(self.live, self.count)
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("entity index out of range")
+        return self.live[index % self.count]
+
+    def clear(self):
+        for index in range(self.count):
+            self.live[index].alive = False
+        self.count = 0
+
+    def spawn(self):
+        """Takes an entity off the free-list; the caller sets its fields."""
+        if self.count == len(self.live):
+            self.live.extend(self.factory() for _ in range(len(self.live)))
+        entity = self.live[self.count]
+        entity.alive = True
+        self.count += 1
+        return entity
+
+    def release(self, entity):
+        """Marks a live entity dead; compact() returns it to the free-list."""
+        entity.alive = False
+
+    def compact(self):
+        """Moves released entities to the free-list, keeping the rest in order."""
+        live = self.live
+        kept = index = 0
+        while index < self.count:  # No iterator or range object per tick
+            if live[index].alive:
+                live[kept], live[index] = live[index], live[kept]
+                kept += 1
+            index += 1
+        self.count = kept
+
+
+def _benchmark(frames=20_000):
+    import random
+    import tracemalloc
+
+    import arcade
+    from arcade import EggSim, FlappySim
+
+    class EndlessEggs(EggSim):
+        # Steady state: eggs keep spawning and dying, the game never ends
+        game_over = False
+
+    class EndlessFlappy(FlappySim):
+        def step(self, jump=False):
+            super().step(jump)
+            self.game_over = False
+            self.bird_y, self.velocity = 300.0, 0.0
+
+    rng = random.Random(0)
+    sim_files = [tracemalloc.Filter(True, arcade.__file__), tracemalloc.Filter(True, __file__)]
+    print(f"{'simulation':<12} {'bytes kept':>10} {'mean bytes/tick':>16} {'max bytes/tick':>15}")
+    for name, sim, inputs in (
+            ("egg", EndlessEggs(1), [(rng.random() < 0.3, rng.random() < 0.3) for _ in range(frames)]),
+            ("flappy", EndlessFlappy(1), [(False,)] * frames)):
+        # Traced from the start so the counters' current values are traced in both snapshots
+        tracemalloc.start()
+        for held in inputs:  # Warm up: grow the pool and fill CPython's free-lists
+            sim.step(*held)
+        before = tracemalloc.take_snapshot().filter_traces(sim_files)
+        for held in inputs:
+            sim.step(*held)
+        after = tracemalloc.take_snapshot().filter_traces(sim_files)
+        kept = sum(max(stat.size_diff, 0) for stat in after.compare_to(before, "lineno"))
+        assert kept == 0, [str(stat) for stat in after.compare_to(before, "lineno") if stat.size_diff > 0]
+
+        total = worst = 0
+        for held in inputs:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            sim.step(*held)
+            peak = tracemalloc.get_traced_memory()[1] - before
+            total += peak
+            worst = max(worst, peak)
+        tracemalloc.stop()
+        print(f"{name:<12} {kept:>10} {total / frames:>16.0f} {worst:>15}")
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,570 @@
+"""Gym-style environments for training agents on the games, no window needed.
+
+Every environment has reset() -> observation and
+step(action) -> (observation, reward, done, info), like the classic Gym API:
+
+    FlappyEnv   actions 0 = nothing, 1 = jump
+    EggEnv      actions 0 = stay, 1 = left, 2 = right
+    PongEnv     actions 0 = stay, 1 = left, 2 = right
+    Game2048Env actions 0-3 = left, right, up, down (bitboard.DIRECTIONS)
+
+The scalar environments wrap the simulations the games themselves run
+(arcade.py, game2048.py). The Vec* environments step N independent
+instances per call with the whole state held in NumPy arrays: actions is
+an array of N, and observation, reward and done come back as arrays with
+N rows. Finished instances (done, or max_steps reached) are reset in
+place, so the returned observation is already the first of the next
+episode; info["score"] holds the scores before the reset.
+
+The 2048 environments also return info["legal"], the directions that
+change the board in the returned observation (a 4-bit mask, or an (N, 4)
+bool array for Vec2048Env), for masking out moves that do nothing.
+
+The vectorized arcade games take their constants from the arcade.py
+simulations and step them by the same rules, swept collisions and
+screen-edge clamping included, but draw from their own NumPy rng and cap
+the eggs or balls alive per instance (extra spawns are dropped).
+Vec2048Env runs batch2048, which does match game2048 seed for seed.
+
+Observations are either "state" (a short float32 feature vector per
+instance; for 2048 the grid of tile values, 0 for empty cells, in both
+environments) or "frame", a downsampled occupancy
+image with 1 for pipes, the basket and the paddle and 2 for the bird,
+eggs and balls. Running this module benchmarks steps per second.
+"""
+
+import numpy as np
+
+from arcade import EggSim, FlappySim, PongSim
+from batch2048 import KERNELS, BatchSimulator
+from game2048 import make_game
+from sweep import times_of_impact
+
+FRAME_SCALE = 10  # Pixels per frame cell
+
+
+def _nearest_bottom(alive, y, k):
+    """Column indexes of the k lowest live objects per row (dead ones last)."""
+    if y.shape[1] < k:
+        pad = k - y.shape[1]
+        alive = np.pad(alive, ((0, 0), (0, pad)))
+        y = np.pad(y, ((0, 0), (0, pad)))
+    order = np.argsort(np.where(alive, -y, np.inf), axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(alive, order, axis=1), alive.shape[1]
+
+
+def _gather(values, order, width):
+    if values.shape[1] < width:
+        values = np.pad(values, ((0, 0), (0, width - values.shape[1])))
+    return np.take_along_axis(values, order, axis=1)
+
+
+def _blank_frames(n, width, height, scale):
+    return np.zeros((n, height // scale, width // scale), dtype=np.uint8)
+
+
+def _draw_bar(frames, left, bar_width, top, scale):
+    """Marks a horizontal bar (basket, paddle) in the frame row at pixel y `top`."""
+    cells = (np.arange(frames.shape[2]) + 0.5) * scale
+    covered = (cells >= left[:, None]) & (cells < left[:, None] + bar_width)
+    row = min(int(top) // scale, frames.shape[1] - 1)
+    frames[:, row, :][covered] = 1
+
+
+def _draw_points(frames, alive, x, y, scale):
+    """Marks every live point object (egg, ball) at its cell."""
+    rows, cols = np.nonzero(alive)
+    if len(rows):
+        iy = np.clip((y[rows, cols] // scale).astype(np.int64), 0, frames.shape[1] - 1)
+        ix = np.clip((x[rows, cols] // scale).astype(np.int64), 0, frames.shape[2] - 1)
+        frames[rows, iy, ix] = 2
+
+
+def flappy_observation(bird_y, velocity, pipe_x, pipe_top, obs_type="state", scale=FRAME_SCALE):
+    S = FlappySim
+    if obs_type == "state":
+        return np.stack([bird_y / S.HEIGHT, velocity / 10, (pipe_x - S.bird_x) / S.WIDTH,
+                         (pipe_top + S.pipe_gap / 2 - bird_y) / S.HEIGHT], axis=1).astype(np.float32)
+    gx = (np.arange(S.WIDTH // scale) + 0.5) * scale
+    gy = (np.arange(S.HEIGHT // scale)[:, None] + 0.5) * scale
+    pipe_x, pipe_top = pipe_x[:, None, None], pipe_top[:, None, None]
+    pipe = (gx >= pipe_x) & (gx < pipe_x + S.pipe_width) & ((gy < pipe_top) | (gy > pipe_top + S.pipe_gap))
+    bird = (np.abs(gx - S.bird_x) <= S.bird_radius) & (np.abs(gy - bird_y[:, None, None]) <= S.bird_radius)
+    return np.where(bird, 2, pipe).astype(np.uint8)
+
+
+def egg_observation(basket_x, lives, alive, x, y, obs_type="state", k=3, scale=FRAME_SCALE):
+    S = EggSim
+    if obs_type == "state":
+        order, present, width = _nearest_bottom(alive, y, k)
+        eggs = np.stack([_gather(x, order, width) / S.WIDTH, _gather(y, order, width) / S.HEIGHT,
+                         np.ones(order.shape)], axis=2) * present[:, :, None]
+        return np.concatenate([np.stack([basket_x / S.WIDTH, lives / 3], axis=1),
+                               eggs.reshape(len(basket_x), -1)], axis=1).astype(np.float32)
+    frames = _blank_frames(len(basket_x), S.WIDTH, S.HEIGHT, scale)
+    _draw_bar(frames, basket_x, S.basket_width, S.basket_y, scale)
+    _draw_points(frames, alive, x, y, scale)
+    return frames
+
+
+def pong_observation(paddle_x, lives, alive, x, y, dx, dy, obs_type="state", k=4, scale=FRAME_SCALE):
+    S = PongSim
+    if obs_type == "state":
+        order, present, width = _nearest_bottom(alive, y, k)
+        balls = np.stack([_gather(x, order, width) / S.WIDTH, _gather(y, order, width) / S.HEIGHT,
+                          _gather(dx, order, width) / S.ball_speed, _gather(dy, order, width) / S.ball_speed,
+                          np.ones(order.shape)], axis=2) * present[:, :, None]
+        return np.concatenate([np.stack([paddle_x / S.WIDTH, lives / 3], axis=1),
+                               balls.reshape(len(paddle_x), -1)], axis=1).astype(np.float32)
+    frames = _blank_frames(len(paddle_x), S.WIDTH, S.HEIGHT, scale)
+    _draw_bar(frames, paddle_x, S.paddle_width, S.paddle_y, scale)
+    _draw_points(frames, alive, x, y, scale)
+    return frames
+
+
+class FlappyEnv:
+    """One FlappySim; reward +1 per pipe passed, -1 on crashing."""
+
+    n_actions = 2
+
+    def __init__(self, seed=None, obs_type="state"):
+        self.rng = np.random.default_rng(seed)
+        self.obs_type = obs_type
+        self.reset()
+
+    def observe(self):
+        sim = self.sim
+        pipe = sim.pipes[0]
+        return flappy_observation(np.array([sim.bird_y], float), np.array([sim.velocity], float),
+                                  np.array([pipe.x], float), np.array([pipe.top], float),
+                                  self.obs_type)[0]
+
+    def reset(self):
+        self.sim = FlappySim(int(self.rng.integers(2 ** 63)))
+        return self.observe()
+
+    def step(self, action):
+        sim = self.sim
+        score = sim.score
+        sim.step(jump=action == 1)
+        reward = sim.score - score - sim.game_over
+        return self.observe(), reward, sim.game_over, {"score": sim.score}
+
+
+class EggEnv:
+    """One EggSim; reward +1 per egg caught, -1 per egg missed."""
+
+    n_actions = 3
+
+    def __init__(self, seed=None, obs_type="state"):
+        self.rng = np.random.default_rng(seed)
+        self.obs_type = obs_type
+        self.reset()
+
+    def observe(self):
+        sim = self.sim
+        x = np.array([[egg.x for egg in sim.eggs]], float)
+        y = np.array([[egg.y for egg in sim.eggs]], float)
+        return egg_observation(np.array([sim.basket_x], float), np.array([sim.lives], float),
+                               np.ones(x.shape, bool), x, y, self.obs_type)[0]
+
+    def reset(self):
+        self.sim = EggSim(int(self.rng.integers(2 ** 63)))
+        return self.observe()
+
+    def step(self, action):
+        sim = self.sim
+        score, lives = sim.score, sim.lives
+        sim.step(left=action == 1, right=action == 2)
+        reward = (sim.score - score) - (lives - sim.lives)
+        return self.observe(), reward, sim.game_over, {"score": sim.score}
+
+
+class PongEnv:
+    """One PongSim; reward +1 per paddle hit, -1 per ball lost."""
+
+    n_actions = 3
+
+    def __init__(self, seed=None, obs_type="state"):
+        self.rng = np.random.default_rng(seed)
+        self.obs_type = obs_type
+        self.reset()
+
+    def observe(self):
+        sim = self.sim
+        balls = sim.balls
+        return pong_observation(np.array([sim.paddle_x], float), np.array([sim.lives], float),
+                                np.ones((1, len(balls)), bool), balls.x[None], balls.y[None],
+                                balls.dx[None], balls.dy[None], self.obs_type)[0]
+
+    def reset(self):
+        self.sim = PongSim(int(self.rng.integers(2 ** 63)))
+        return self.observe()
+
+    def step(self, action):
+        sim = self.sim
+        score, lives = sim.score, sim.lives
+        sim.step(left=action == 1, right=action == 2)
+        reward = (sim.score - score) // 10 - (lives - sim.lives)
+        return self.observe(), reward, sim.game_over, {"score": sim.score}
+
+
+class Game2048Env:
+    """One 2048 game; reward is the score gained; observation is the tile grid."""
+
+    n_actions = 4
+
+    def __init__(self, variant="classic", seed=None):
+        self.variant = variant
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def observe(self):
+        return np.array(self.game.grid, dtype=np.int64)
+
+    def reset(self):
+        # Training never undoes, so the game keeps no undo history
+        self.game = make_game(self.variant, int(self.rng.integers(2 ** 63)), history=False)
+        return self.observe()
+
+    def step(self, action):
+        game = self.game
+        score = game.score
+        game.move(("left", "right", "up", "down")[action])
+        legal = game.legal_mask()
+        return self.observe(), game.score - score, not legal, {"score": game.score, "legal": legal}
+
+
+class VecEnv:
+    """Shared bookkeeping for the vectorized environments."""
+
+    def __init__(self, n, seed=None, obs_type="state", max_steps=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.obs_type = obs_type
+        self.max_steps = max_steps
+        self.score = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.episodes = 0
+
+    def reset(self):
+        """Starts a new episode in every instance; returns the observations."""
+        self._reset(np.ones(self.n, dtype=bool))
+        return self.observe()
+
+    def _finish(self, rewards, done):
+        """Counts the step, resets finished instances and builds the return tuple."""
+        self.steps += 1
+        truncated = self.steps >= self.max_steps if self.max_steps else np.zeros(self.n, dtype=bool)
+        finished = done | truncated
+        info = {"score": self.score.copy(), "truncated": truncated & ~done}
+        if finished.any():
+            self.episodes += int(finished.sum())
+            self._reset(finished)
+        return self.observe(), rewards.astype(np.float32), finished, info
+
+    def _actions(self, actions):
+        return np.broadcast_to(np.asarray(actions), (self.n,))
+
+
+def _fill_slots(alive, new):
+    """Pairs each True in `new` with a free slot of the same row.
+
+    Returns (rows, slots, sources): the row, the free slot to write and the
+    column of `new` it comes from; entries past a row's free slots are dropped.
+    """
+    rank = np.cumsum(new, axis=1) - 1
+    free_order = np.argsort(alive, axis=1, kind="stable")  # Free slots first
+    n_free = (~alive).sum(axis=1)
+    rows, sources = np.nonzero(new)
+    ranks = rank[rows, sources]
+    fits = ranks < n_free[rows]
+    rows, sources, ranks = rows[fits], sources[fits], ranks[fits]
+    return rows, free_order[rows, ranks], sources
+
+
+class VecFlappyEnv(VecEnv):
+    """N flappy birds in arrays; there is always exactly one pipe on screen."""
+
+    n_actions = 2
+
+    def __init__(self, n, seed=None, obs_type="state", max_steps=None):
+        super().__init__(n, seed, obs_type, max_steps)
+        self.bird_y = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.pipe_x = np.zeros(n)
+        self.pipe_top = np.zeros(n)
+        self.reset()
+
+    def _new_pipe_tops(self, count):
+        return self.rng.integers(50, FlappySim.HEIGHT - FlappySim.pipe_gap - 50, count, endpoint=True)
+
+    def _reset(self, mask):
+        self.bird_y[mask] = FlappySim.HEIGHT // 2
+        self.velocity[mask] = 0
+        self.pipe_x[mask] = FlappySim.WIDTH
+        self.pipe_top[mask] = self._new_pipe_tops(int(mask.sum()))
+        self.score[mask] = 0
+        self.steps[mask] = 0
+
+    def observe(self):
+        return flappy_observation(self.bird_y, self.velocity, self.pipe_x, self.pipe_top, self.obs_type)
+
+    def step(self, actions):
+        S = FlappySim
+        jump = self._actions(actions) == 1
+        self.velocity[jump] = S.jump_strength  # Jump effect
+        self.velocity += S.gravity
+        prev_bird_y = self.bird_y.copy()
+        self.bird_y += self.velocity
+
+        self.pipe_x -= S.pipe_speed
+        bottom = self.pipe_top + S.pipe_gap
+        hit = ((S.bird_x < self.pipe_x + S.pipe_width) & (S.bird_x + S.bird_radius > self.pipe_x) &
+               ((self.bird_y < self.pipe_top) | (self.bird_y + S.bird_radius > bottom)))
+        if S.swept:
+            # FlappySim.sweep_pipe for the birds level with the pipe at some time in the step
+            size = S.bird_radius
+            rows = np.flatnonzero(~hit & (S.bird_x < self.pipe_x + S.pipe_speed + S.pipe_width) &
+                                  (S.bird_x + size > self.pipe_x))
+            if len(rows):
+                start_y = prev_bird_y[rows]
+                vy = self.bird_y[rows] - start_y
+                x0 = self.pipe_x[rows] + S.pipe_speed
+                for top, height in ((-S.HEIGHT, self.pipe_top[rows] + S.HEIGHT), (bottom[rows], 2 * S.HEIGHT)):
+                    hit[rows] |= np.isfinite(times_of_impact(S.bird_x, start_y, size, size, S.pipe_speed, vy,
+                                                             x0, top, S.pipe_width, height))
+
+        # A pipe leaving the screen is replaced at the right edge
+        passed = self.pipe_x < -S.pipe_width
+        if passed.any():
+            self.pipe_x[passed] = S.WIDTH
+            self.pipe_top[passed] = self._new_pipe_tops(int(passed.sum()))
+            self.score += passed
+
+        done = hit | (self.bird_y > S.HEIGHT) | (self.bird_y < 0)
+        return self._finish(passed.astype(np.int64) - done, done)
+
+
+class VecEggEnv(VecEnv):
+    """N egg-catching games with up to max_eggs eggs each in slot arrays."""
+
+    n_actions = 3
+
+    def __init__(self, n, seed=None, obs_type="state", max_steps=None, max_eggs=16):
+        super().__init__(n, seed, obs_type, max_steps)
+        self.basket_x = np.zeros(n)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.alive = np.zeros((n, max_eggs), dtype=bool)
+        self.x = np.zeros((n, max_eggs))
+        self.y = np.zeros((n, max_eggs))
+        self.speed = np.zeros((n, max_eggs))
+        self.reset()
+
+    def _reset(self, mask):
+        self.basket_x[mask] = EggSim.WIDTH // 2
+        self.lives[mask] = 3
+        self.alive[mask] = False
+        self.score[mask] = 0
+        self.steps[mask] = 0
+
+    def observe(self):
+        return egg_observation(self.basket_x, self.lives, self.alive, self.x, self.y, self.obs_type)
+
+    def step(self, actions):
+        S = EggSim
+        actions = self._actions(actions)
+        prev_basket_x = self.basket_x.copy()
+        self.basket_x -= S.basket_speed * ((actions == 1) & (self.basket_x > 0))
+        self.basket_x += S.basket_speed * ((actions == 2) & (self.basket_x < S.WIDTH - S.basket_width))
+        if S.clamped:
+            np.clip(self.basket_x, 0, S.WIDTH - S.basket_width, out=self.basket_x)
+
+        # Spawn eggs randomly into a free slot
+        roll = self.rng.integers(1, 100, self.n, endpoint=True)
+        rows = np.flatnonzero((roll > 100 - S.spawn_chance) & ~self.alive.all(axis=1))
+        if len(rows):
+            slots = np.argmin(self.alive[rows], axis=1)
+            self.x[rows, slots] = self.rng.integers(50, S.WIDTH - 50, len(rows), endpoint=True)
+            self.y[rows, slots] = S.spawn_y
+            self.speed[rows, slots] = self.rng.integers(*S.egg_speeds, len(rows), endpoint=True)
+            self.alive[rows, slots] = True
+
+        # Move eggs, then catch or miss them
+        self.y += self.speed
+        basket_x = self.basket_x[:, None]
+        caught = (self.alive & (basket_x < self.x) & (self.x < basket_x + S.basket_width) &
+                  (S.basket_y < self.y) & (self.y < S.basket_y + S.basket_height))
+        if S.swept:
+            # EggSim.sweep_basket for the eggs that were level with the basket during the step
+            start_y = self.y - self.speed
+            rows, slots = np.nonzero(self.alive & ~caught & (start_y < S.basket_y + S.basket_height) &
+                                     (self.y > S.basket_y))
+            if len(rows):
+                toi = times_of_impact(self.x[rows, slots], start_y[rows, slots], 0, 0,
+                                      prev_basket_x[rows] - self.basket_x[rows], self.speed[rows, slots],
+                                      prev_basket_x[rows], S.basket_y, S.basket_width, S.basket_height)
+                caught[rows, slots] = np.isfinite(toi)
+        missed = self.alive & ~caught & (self.y > S.HEIGHT)
+        self.alive &= ~(caught | missed)
+        n_caught, n_missed = caught.sum(axis=1), missed.sum(axis=1)
+        self.score += n_caught
+        self.lives -= n_missed
+        return self._finish(n_caught - n_missed, self.lives <= 0)
+
+
+class VecPongEnv(VecEnv):
+    """N pong games with up to max_balls balls each in slot arrays."""
+
+    n_actions = 3
+
+    def __init__(self, n, seed=None, obs_type="state", max_steps=None, max_balls=32):
+        super().__init__(n, seed, obs_type, max_steps)
+        self.paddle_x = np.zeros(n)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.alive = np.zeros((n, max_balls), dtype=bool)
+        self.x = np.zeros((n, max_balls))
+        self.y = np.zeros((n, max_balls))
+        self.dx = np.zeros((n, max_balls))
+        self.dy = np.zeros((n, max_balls))
+        self.reset()
+
+    def _random_dx(self, count):
+        return self.rng.choice((-PongSim.ball_speed, PongSim.ball_speed), size=count).astype(float)
+
+    def _serve(self, rows):
+        """Puts a new ball at the top of the screen in slot 0 of each row."""
+        self.alive[rows] = False
+        self.alive[rows, 0] = True
+        self.x[rows, 0] = self.rng.integers(50, PongSim.WIDTH - 50, len(rows), endpoint=True)
+        self.y[rows, 0] = 0
+        self.dx[rows, 0] = self._random_dx(len(rows))
+        self.dy[rows, 0] = PongSim.ball_speed
+
+    def _reset(self, mask):
+        self.paddle_x[mask] = PongSim.WIDTH // 2 - PongSim.paddle_width // 2
+        self.lives[mask] = 3
+        self.score[mask] = 0
+        self.steps[mask] = 0
+        self._serve(np.flatnonzero(mask))
+
+    def observe(self):
+        return pong_observation(self.paddle_x, self.lives, self.alive, self.x, self.y, self.dx, self.dy,
+                                self.obs_type)
+
+    def step(self, actions):
+        S = PongSim
+        r = S.ball_radius
+        actions = self._actions(actions)
+        self.paddle_x -= S.paddle_speed * ((actions == 1) & (self.paddle_x > 0))
+        self.paddle_x += S.paddle_speed * ((actions == 2) & (self.paddle_x < S.WIDTH - S.paddle_width))
+        if S.clamped:
+            np.clip(self.paddle_x, 0, S.WIDTH - S.paddle_width, out=self.paddle_x)
+
+        alive = self.alive
+        x, y, dx, dy = self.x, self.y, self.dx, self.dy
+        vx = dx.copy()  # Before any wall bounce, for the sweep
+        x += dx
+        y += dy
+        dx[alive & ((x <= 0) | (x >= S.WIDTH - r))] *= -1  # Walls
+
+        # Paddle hits bounce up and duplicate the ball
+        bottom = y + r
+        paddle_x = self.paddle_x[:, None]
+        hit = (alive & (S.paddle_y <= bottom) & (bottom <= S.paddle_y + S.paddle_height) &
+               (paddle_x <= x) & (x <= paddle_x + S.paddle_width))
+        if S.swept:
+            # Falling balls whose bottom crossed the paddle during the step
+            rows, slots = np.nonzero(alive & ~hit & (dy > 0) & (bottom > S.paddle_y))
+            if len(rows):
+                fx, fy = vx[rows, slots], dy[rows, slots]
+                toi = times_of_impact(x[rows, slots] - fx, bottom[rows, slots] - fy, 0, 0, fx, fy,
+                                      self.paddle_x[rows], S.paddle_y, S.paddle_width, S.paddle_height,
+                                      closed=True)
+                hit[rows, slots] = np.isfinite(toi)
+        n_hits = hit.sum(axis=1)
+        if n_hits.any():
+            # Balls that went through the paddle come back to its bottom edge
+            y[hit] = np.minimum(y[hit], S.paddle_y + S.paddle_height - r)
+            dy[hit] *= -1
+            dx[hit] = self._random_dx(int(n_hits.sum()))
+            self.score += 10 * n_hits
+            spawn_x, spawn_y = x.copy(), y - 10
+
+        # Balls below the screen cost a life
+        fell = alive & (y > S.HEIGHT)
+        alive &= ~fell
+        n_fell = fell.sum(axis=1)
+        self.lives -= n_fell
+
+        if n_hits.any():
+            rows, slots, sources = _fill_slots(alive, hit)
+            x[rows, slots] = spawn_x[rows, sources]
+            y[rows, slots] = spawn_y[rows, sources]
+            dx[rows, slots] = self._random_dx(len(rows))
+            dy[rows, slots] = -S.ball_speed
+            alive[rows, slots] = True
+
+        empty = np.flatnonzero(~alive.any(axis=1) & (self.lives > 0))
+        if len(empty):
+            self._serve(empty)
+        return self._finish(n_hits - n_fell, self.lives <= 0)
+
+
+class Vec2048Env(VecEnv):
+    """N 2048 boards on batch2048; observation is the (N, size, size) tile grid, like Game2048Env."""
+
+    n_actions = 4
+
+    def __init__(self, n, variant="classic", seed=None, max_steps=None):
+        super().__init__(n, seed, "state", max_steps)
+        seeds = self.rng.integers(2 ** 63, size=n).tolist()
+        self.sim = BatchSimulator(KERNELS[variant](), seeds)
+        self.score = self.sim.scores
+
+    def _reset(self, mask):
+        self.sim.reset_boards(mask)
+        self.steps[mask] = 0
+
+    def observe(self):
+        return self.sim.grids
+
+    def step(self, actions):
+        sim = self.sim
+        before = sim.scores.copy()
+        sim.move(self._actions(actions))
+        observation, rewards, finished, info = self._finish(sim.scores - before, sim.check_game_over())
+        info["legal"] = sim.legal_moves()  # Kept up to date through the resets
+        return observation, rewards, finished, info
+
+
+def _benchmark(steps=200):
+    import time
+
+    print(f"{'environment':<16} {'instances':>9} {'steps/s':>12}")
+    for name, make_scalar, make_vec in (
+            ("flappy", FlappyEnv, VecFlappyEnv),
+            ("egg", EggEnv, VecEggEnv),
+            ("pong", PongEnv, VecPongEnv),
+            ("2048 classic", Game2048Env, Vec2048Env)):
+        env = make_scalar(seed=0)
+        env.reset()
+        rng = np.random.default_rng(0)
+        actions = rng.integers(env.n_actions, size=steps * 10).tolist()
+        start = time.perf_counter()
+        for action in actions:
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+        print(f"{name:<16} {'scalar':>9} {len(actions) / (time.perf_counter() - start):>12,.0f}")
+        for n in (64, 1024, 8192):
+            env = make_vec(n, seed=0)
+            actions = rng.integers(env.n_actions, size=(steps, n))
+            start = time.perf_counter()
+            for step_actions in actions:
+                env.step(step_actions)
+            print(f"{name:<16} {n:>9} {steps * n / (time.perf_counter() - start):>12,.0f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
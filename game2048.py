@@ -0,0 +1,462 @@
+"""Display-free game state for the 2048 variants.
+
+Nothing in here imports pygame, so boards can be created, moved and
+simulated headless (many at once in one process). The pygame scripts are
+thin renderers over these classes:
+
+    ClassicGame      - game_2048 classic.py (4x4, spawns 2 or 4)
+    AdaptiveGame     - 2048_8x8grid.py (spawn value follows the highest tile)
+    TripleMergeGame  - new 8x8.py (three equal tiles merge, 2-3 spawns)
+
+After a successful slide, `last_moves` lists the tiles it moved or merged
+as (src, dst, value, merged) with cells numbered r * size + c, for the
+renderers to animate.
+
+All randomness goes through `self.rng.random()` so a seeded rng replays a
+game exactly. The default rng is SplitMix64, which batch2048 implements
+with the same arithmetic, so a seed gives the same game in both engines.
+"""
+
+import os
+
+from bitboard import MASK_DIRECTIONS, get_bitboard
+from history2048 import BoardHistory
+
+
+class SplitMix64:
+    """Small counter-based rng; one 64-bit state, one random() per step."""
+
+    GAMMA = 0x9E3779B97F4A7C15
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.state = seed & self.MASK
+
+    def next_u64(self):
+        self.state = (self.state + self.GAMMA) & self.MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & self.MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & self.MASK
+        return z ^ (z >> 31)
+
+    def random(self):
+        """Returns a float in [0, 1) built from the top 53 bits."""
+        return (self.next_u64() >> 11) * (1.0 / (1 << 53))
+
+
+class SlideTrail:
+    """The lazy `last_moves` of every variant.
+
+    slide() stores (board before, direction) in _last_slide and the
+    subclass's _trail() turns that into the tile moves when asked.
+    """
+
+    @property
+    def last_moves(self):
+        """The tiles the last slide moved or merged (empty if it moved nothing).
+
+        Worked out from the board before the slide on first access, so
+        headless play never pays for it.
+        """
+        if self._last_slide is not None:
+            self._last_moves = self._trail(*self._last_slide)
+            self._last_slide = None
+        return self._last_moves
+
+
+class Game2048(SlideTrail):
+    """Shared state and spawn logic for the bitboard-backed variants."""
+
+    size = 4
+    bits = 4
+
+    def __init__(self, seed=None, rng=None, size=None):
+        if size is not None:
+            self.size = size
+        self.rng = rng if rng is not None else SplitMix64(seed)
+        self.tables = get_bitboard(self.size, self.bits)
+        self.reset()
+
+    def reset(self):
+        """Clears the board and places the starting tiles."""
+        self.board = 0
+        self.score = 0
+        self.moves = 0
+        self._last_slide = None
+        self._last_moves = []
+        self.add_new_tile()
+        self.add_new_tile()
+
+    @property
+    def grid(self):
+        """The board as a list-of-lists of tile values."""
+        return self.tables.unpack(self.board)
+
+    @grid.setter
+    def grid(self, grid):
+        self.board = self.tables.pack(grid)
+
+    def get_highest_tile(self):
+        """Returns the highest tile in the grid."""
+        return self.tables.highest_tile(self.board)
+
+    def new_tile_value(self, roll):
+        """Returns the value of a spawned tile for a uniform roll in [0, 1)."""
+        return 2 if roll < 0.9 else 4
+
+    def spawn_odds(self, board):
+        """Returns [(value, probability)] for a tile spawned on `board`."""
+        return [(2, 0.9), (4, 0.1)]
+
+    def spawns_after(self, direction, last_direction):
+        """Returns True if a successful move in `direction` spawns a tile."""
+        return True
+
+    def add_new_tile(self):
+        """Adds one new tile to a random empty cell; returns its (index, value) or None."""
+        empty_cells = self.tables.empty_cells(self.board)
+        if empty_cells:
+            index = empty_cells[int(self.rng.random() * len(empty_cells))]
+            value = self.new_tile_value(self.rng.random())
+            self.board = self.tables.set(self.board, index, value)
+            return index, value
+        return None
+
+    def _trail(self, board, direction):
+        return self.tables.move_trail(board, direction)
+
+    def slide(self, direction):
+        """Moves and merges tiles without spawning; returns True if anything moved."""
+        board, gained = self.tables.move(self.board, direction)
+        self._last_moves = []
+        if board == self.board:
+            self._last_slide = None
+            return False
+        self._last_slide = (self.board, direction)
+        self.board = board
+        self.score += gained
+        self.moves += 1
+        return True
+
+    def move(self, direction):
+        """Plays one turn: slide, then spawn if the board changed."""
+        moved = self.slide(direction)
+        if moved:
+            self.add_new_tile()
+        return moved
+
+    def legal_mask(self):
+        """Returns the directions that change the board as bits (1 << DIRECTIONS index)."""
+        return self.tables.legal_mask(self.board)
+
+    def legal_directions(self):
+        """Returns the directions that change the board, in DIRECTIONS order."""
+        return MASK_DIRECTIONS[self.legal_mask()]
+
+    def check_game_over(self):
+        """Returns True if no direction changes the board."""
+        return not self.tables.legal_mask(self.board)
+
+
+class ClassicGame(Game2048):
+    """The 4x4 rules from game_2048 classic.py."""
+
+
+class AdaptiveGame(Game2048):
+    """The 8x8 rules from 2048_8x8grid.py.
+
+    New tiles scale with the highest tile on the board, a tile is only
+    spawned when the direction differs from the previous move, and every
+    move can be undone and redone (see history2048). Headless play that
+    never undoes can pass history=False to keep no history at all.
+    """
+
+    size = 8
+    # Adaptive spawns can push tiles past 32768, so use 5-bit cells
+    bits = 5
+
+    # (highest tile, spawned value) from largest to smallest
+    SPAWN_STEPS = (
+        (16384, 4096), (8192, 2048), (4096, 1024), (2048, 512), (1024, 256),
+        (512, 128), (256, 64), (128, 32), (64, 16), (32, 8),
+    )
+
+    def __init__(self, seed=None, rng=None, size=None, history=True):
+        self.keep_history = history
+        super().__init__(seed, rng, size)
+
+    def reset(self):
+        self.last_direction = None
+        super().reset()
+        self.history = BoardHistory(self.tables, self.board) if self.keep_history else None
+
+    def new_tile_value(self, roll):
+        """Determines the new tile value based on the highest tile present."""
+        highest_tile = self.get_highest_tile()
+        for threshold, value in self.SPAWN_STEPS:
+            if highest_tile >= threshold:
+                return value
+        return 2 if roll < 0.9 else 4
+
+    def spawn_odds(self, board):
+        highest_tile = self.tables.highest_tile(board)
+        for threshold, value in self.SPAWN_STEPS:
+            if highest_tile >= threshold:
+                return [(value, 1.0)]
+        return [(2, 0.9), (4, 0.1)]
+
+    def spawns_after(self, direction, last_direction):
+        return direction != last_direction
+
+    def move(self, direction):
+        moved = self.slide(direction)
+        if moved:
+            spawn = None
+            if self.spawns_after(direction, self.last_direction):
+                spawn = self.add_new_tile()
+            # A repeated direction leaves last_direction as it was anyway
+            self.last_direction = direction
+            if self.history is not None:
+                self.history.record(direction, spawn, self.board, self.score)
+        return moved
+
+    def _restore(self, node):
+        self.board, self.score, self.moves = self.history.state(node)
+        self.last_direction = self.history.direction(node)
+
+    def undo(self):
+        """Restores the state before the last move; returns False if there is none."""
+        if self.history is None:
+            return False
+        node = self.history.undo()
+        if node is None:
+            return False
+        self._restore(node)
+        self._last_slide = None
+        self._last_moves = []
+        return True
+
+    def redo(self):
+        """Replays the last undone move (of the chosen branch); returns False if there is none."""
+        if self.history is None:
+            return False
+        previous = self.board
+        node = self.history.redo()
+        if node is None:
+            return False
+        # One move forward, no need to rebuild from a checkpoint
+        self.board, self.score = self.history.apply(node, previous, self.score)
+        self.moves += 1
+        self.last_direction = self.history.direction(node)
+        self._last_slide = (previous, self.last_direction)
+        self._last_moves = []
+        return True
+
+    def next_branch(self):
+        """Switches redo() to the next timeline branching off the current state."""
+        return self.history is not None and self.history.next_branch() is not None
+
+
+def compress_and_merge(row):
+    """Compress row (left move logic) and merge more than two tiles at once.
+
+    Returns (new_row, score) where score is the sum of merged tiles.
+    """
+    new_row = [num for num in row if num != 0]  # Remove zeroes
+    merged = []
+    score = 0
+    i = 0
+    while i < len(new_row):
+        if i < len(new_row) - 2 and new_row[i] == new_row[i + 1] == new_row[i + 2]:
+            merged.append(new_row[i] * 3)  # Merge three tiles
+            score += merged[-1]
+            i += 3
+        elif i < len(new_row) - 1 and new_row[i] == new_row[i + 1]:
+            merged.append(new_row[i] * 2)  # Merge two tiles
+            score += merged[-1]
+            i += 2
+        else:
+            merged.append(new_row[i])
+            i += 1
+    return merged + [0] * (len(row) - len(merged)), score
+
+
+def compress_and_merge_moves(row):
+    """Where compress_and_merge() sends each tile: [(src, dst, value, merged)].
+
+    merged is the value the tile merges into, or 0 if it only slides. All
+    tiles of a merge are listed; tiles that neither move nor merge are not.
+    """
+    tiles = [(c, num) for c, num in enumerate(row) if num != 0]
+    moves = []
+    i = dst = 0
+    while i < len(tiles):
+        src, num = tiles[i]
+        if i < len(tiles) - 2 and num == tiles[i + 1][1] == tiles[i + 2][1]:
+            moves.extend((c, dst, num, num * 3) for c, _ in tiles[i:i + 3])
+            i += 3
+        elif i < len(tiles) - 1 and num == tiles[i + 1][1]:
+            moves.extend((c, dst, num, num * 2) for c, _ in tiles[i:i + 2])
+            i += 2
+        else:
+            if src != dst:
+                moves.append((src, dst, num, 0))
+            i += 1
+        dst += 1
+    return moves
+
+
+def row_legal_mask(row):
+    """Can-move bits of a row: 1 if a left move changes it, 2 if a right one does.
+
+    A row changes if a tile has an empty cell on that side or two equal
+    tiles touch; three equal tiles always include two that touch. (Triple
+    merge rows rarely repeat, so unlike the bitboard rows there is no table.)
+    """
+    mask = 0
+    for a, b in zip(row, row[1:]):
+        if a and a == b:
+            return 3
+        if b and not a:
+            mask |= 1
+        elif a and not b:
+            mask |= 2
+    return mask
+
+
+class TripleMergeGame(SlideTrail):
+    """The 8x8 rules from new 8x8.py.
+
+    Three equal tiles in a row merge at once, so tiles are not powers of two
+    and the board is kept as a plain list-of-lists. Every successful move
+    spawns two or three tiles.
+    """
+
+    size = 8
+
+    def __init__(self, seed=None, rng=None):
+        self.rng = rng if rng is not None else SplitMix64(seed)
+        self.reset()
+
+    def reset(self):
+        """Clears the board and places the starting tiles."""
+        self.grid = [[0] * self.size for _ in range(self.size)]
+        self.score = 0
+        self.moves = 0
+        self._last_slide = None
+        self._last_moves = []
+        self.add_new_tile()
+
+    def get_highest_tile(self):
+        """Returns the highest tile in the grid."""
+        return max(max(row) for row in self.grid)
+
+    def add_new_tile(self):
+        """Adds 2-3 new tiles in random empty positions."""
+        empty_tiles = [(r, c) for r in range(self.size) for c in range(self.size) if self.grid[r][c] == 0]
+        if empty_tiles:
+            for _ in range(2 + int(self.rng.random() * 2)):  # Spawn 2 or 3 tiles per move
+                if empty_tiles:
+                    row, col = empty_tiles.pop(int(self.rng.random() * len(empty_tiles)))
+                    self.grid[row][col] = 2 if self.rng.random() < 0.5 else 4
+
+    def _slid(self, direction):
+        """Returns (new_grid, score) for a move without touching the game."""
+        if direction in ("up", "down"):
+            rows = [list(col) for col in zip(*self.grid)]
+        elif direction in ("left", "right"):
+            rows = self.grid
+        else:
+            raise ValueError(f"Unknown direction: {direction!r}")
+
+        new_rows = []
+        score = 0
+        for row in rows:
+            if direction in ("right", "down"):
+                new_row, gained = compress_and_merge(row[::-1])
+                new_row.reverse()
+            else:
+                new_row, gained = compress_and_merge(row)
+            new_rows.append(new_row)
+            score += gained
+
+        if direction in ("up", "down"):
+            new_rows = [list(row) for row in zip(*new_rows)]
+        return new_rows, score
+
+    def _trail(self, grid, direction):
+        """Returns the (src, dst, value, merged) tile moves of a move on grid."""
+        last = self.size - 1
+        vertical = direction in ("up", "down")
+        reverse = direction in ("right", "down")
+        rows = zip(*grid) if vertical else grid
+        moves = []
+        for r, row in enumerate(rows):
+            if reverse:
+                row_moves = [(last - src, last - dst, value, merged)
+                             for src, dst, value, merged in compress_and_merge_moves(row[::-1])]
+            else:
+                row_moves = compress_and_merge_moves(row)
+            for src, dst, value, merged in row_moves:
+                if vertical:
+                    moves.append((src * self.size + r, dst * self.size + r, value, merged))
+                else:
+                    moves.append((r * self.size + src, r * self.size + dst, value, merged))
+        return moves
+
+    def slide(self, direction):
+        """Moves and merges tiles without spawning; returns True if anything moved."""
+        new_grid, gained = self._slid(direction)
+        self._last_moves = []
+        if new_grid == self.grid:
+            self._last_slide = None
+            return False
+        self._last_slide = (self.grid, direction)
+        self.grid = new_grid
+        self.score += gained
+        self.moves += 1
+        return True
+
+    def move(self, direction):
+        """Plays one turn: slide, then spawn 2-3 tiles if the board changed."""
+        moved = self.slide(direction)
+        if moved:
+            self.add_new_tile()
+        return moved
+
+    def legal_mask(self):
+        """Returns the directions that change the board as bits (1 << DIRECTIONS index)."""
+        horizontal = vertical = 0
+        for row in self.grid:
+            horizontal |= row_legal_mask(row)
+            if horizontal == 3:
+                break
+        for column in zip(*self.grid):
+            vertical |= row_legal_mask(column)
+            if vertical == 3:
+                break
+        return horizontal | vertical << 2
+
+    def legal_directions(self):
+        """Returns the directions that change the board, in DIRECTIONS order."""
+        return MASK_DIRECTIONS[self.legal_mask()]
+
+    def check_game_over(self):
+        """Checks if the game is over (no possible moves left)."""
+        return not self.legal_mask()
+
+
+VARIANTS = {
+    "classic": ClassicGame,
+    "adaptive": AdaptiveGame,
+    "triple": TripleMergeGame,
+}
+
+
+def make_game(variant, seed=None, history=True):
+    """Creates a game by VARIANTS name; history=False drops the undo history (headless play)."""
+    if VARIANTS[variant] is AdaptiveGame:
+        return AdaptiveGame(seed, history=history)
+    return VARIANTS[variant](seed)
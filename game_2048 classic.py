@@ -1,17 +1,23 @@
 import pygame
-import random
+from game2048 import ClassicGame
+from ai2048 import make_player
+from bitboard import DIRECTIONS
+from gameloop import IdleLoop
+from profiler import profiler_from_env
+from replay import recorder_from_env
+from textcache import render_text
 
 # Initialize pygame
 pygame.init()
 
 # Game Constants
-GRID_SIZE = 4
+GRID_SIZE = ClassicGame.size
 TILE_SIZE = 100
 MARGIN = 10
 WIDTH = GRID_SIZE * (TILE_SIZE + MARGIN) + MARGIN
 HEIGHT = WIDTH + 50
 BACKGROUND_COLOR = (187, 173, 160)
-FONT = pygame.font.Font(None, 40)
+FONT_SIZE = 40
 
 # Colors for tiles
 COLORS = {
@@ -29,13 +35,18 @@ COLORS = {
     2048: (237, 194, 46),
 }
 
-# Initialize game variables
-grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
-score = 0
+# Key bindings
+KEY_DIRECTIONS = {
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_UP: "up",
+    pygame.K_DOWN: "down",
+}
 
-def draw_grid(screen):
+def draw_grid(screen, game):
     """Draw the 2048 grid."""
     screen.fill(BACKGROUND_COLOR)
+    grid = game.grid
     for row in range(GRID_SIZE):
         for col in range(GRID_SIZE):
             value = grid[row][col]
@@ -45,7 +56,7 @@ def draw_grid(screen):
                               MARGIN + row * (TILE_SIZE + MARGIN),
                               TILE_SIZE, TILE_SIZE), border_radius=8)
             if value > 0:
-                text = FONT.render(str(value), True, (0, 0, 0))
+                text = render_text(str(value), FONT_SIZE, (0, 0, 0))
                 text_rect = text.get_rect(center=(
                     MARGIN + col * (TILE_SIZE + MARGIN) + TILE_SIZE // 2,
                     MARGIN + row * (TILE_SIZE + MARGIN) + TILE_SIZE // 2
@@ -53,110 +64,61 @@ def draw_grid(screen):
                 screen.blit(text, text_rect)
     
     # Draw score
-    score_text = FONT.render(f"Score: {score}", True, (0, 0, 0))
+    score_text = render_text(f"Score: {game.score}", FONT_SIZE, (0, 0, 0))
     screen.blit(score_text, (20, WIDTH))
 
-def add_new_tile():
-    """Add a new tile (2 or 4) to a random empty spot."""
-    empty_cells = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if grid[r][c] == 0]
-    if empty_cells:
-        r, c = random.choice(empty_cells)
-        grid[r][c] = 2 if random.random() < 0.9 else 4
-
-def compress(grid):
-    """Slide all numbers to the left."""
-    new_grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
-    for row in range(GRID_SIZE):
-        position = 0
-        for col in range(GRID_SIZE):
-            if grid[row][col] != 0:
-                new_grid[row][position] = grid[row][col]
-                position += 1
-    return new_grid
-
-def merge(grid):
-    """Merge tiles of the same value."""
-    global score
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE - 1):
-            if grid[row][col] == grid[row][col + 1] and grid[row][col] != 0:
-                grid[row][col] *= 2
-                score += grid[row][col]
-                grid[row][col + 1] = 0
-    return grid
-
-def move_left():
-    """Move all tiles to the left and merge."""
-    global grid
-    grid = compress(grid)
-    grid = merge(grid)
-    grid = compress(grid)
-
-def move_right():
-    """Move all tiles to the right and merge."""
-    global grid
-    grid = [row[::-1] for row in grid]
-    move_left()
-    grid = [row[::-1] for row in grid]
-
-def move_up():
-    """Move all tiles up and merge."""
-    global grid
-    grid = list(map(list, zip(*grid)))
-    move_left()
-    grid = list(map(list, zip(*grid)))
-
-def move_down():
-    """Move all tiles down and merge."""
-    global grid
-    grid = list(map(list, zip(*grid)))
-    move_right()
-    grid = list(map(list, zip(*grid)))
-
-def check_game_over():
-    """Check if there are no more moves left."""
-    for row in range(GRID_SIZE):
-        for col in range(GRID_SIZE):
-            if grid[row][col] == 0:
-                return False
-            if col < GRID_SIZE - 1 and grid[row][col] == grid[row][col + 1]:
-                return False
-            if row < GRID_SIZE - 1 and grid[row][col] == grid[row + 1][col]:
-                return False
-    return True
-
-# Initialize game
-add_new_tile()
-add_new_tile()
-
-# Pygame loop
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("2048 Game")
-
-running = True
-while running:
-    screen.fill(BACKGROUND_COLOR)
-    draw_grid(screen)
-    pygame.display.flip()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            previous_grid = [row[:] for row in grid]
-            if event.key == pygame.K_LEFT:
-                move_left()
-            elif event.key == pygame.K_RIGHT:
-                move_right()
-            elif event.key == pygame.K_UP:
-                move_up()
-            elif event.key == pygame.K_DOWN:
-                move_down()
-
-            if grid != previous_grid:
-                add_new_tile()
-
-            if check_game_over():
-                running = False
-
-pygame.quit()
+def main():
+    recorder = recorder_from_env("2048-classic")  # Set GAME_REPLAY=file to record
+    game = ClassicGame(recorder.seed)
+    player = make_player(game)
+    autoplay = False  # Toggled with A
+
+    def play(direction):
+        recorder.record(DIRECTIONS.index(direction))
+        game.move(direction)
+
+    # Pygame loop
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("2048 Game")
+
+    profiler = profiler_from_env()  # Set GAME_PROFILE=1 for the F3 overlay
+
+    def render():
+        screen.fill(BACKGROUND_COLOR)
+        draw_grid(screen, game)
+        profiler.draw_overlay(screen)
+        pygame.display.flip()
+
+    def handle_event(event):
+        nonlocal autoplay
+        if profiler.handle_event(event):
+            return True
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key in KEY_DIRECTIONS:
+            play(KEY_DIRECTIONS[event.key])
+        elif event.key == pygame.K_a:
+            autoplay = not autoplay
+
+        if game.check_game_over():
+            loop.stop()
+        return True
+
+    def autoplay_step():
+        # AI player makes one move per frame (None: no move changes the board)
+        direction = player.choose_move()
+        if direction is not None:
+            play(direction)
+        if game.check_game_over():
+            loop.stop()
+
+    # Sleeps until a key is pressed; only the AI player keeps it busy
+    loop = IdleLoop(handle_event, render, busy=lambda: autoplay, step=autoplay_step,
+                    profiler=profiler)
+    loop.run()
+
+    recorder.close(game)
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Fixed-timestep game loop with interpolated rendering.
+
+The simulation always advances in ticks of exactly `dt` seconds, however
+long a frame takes: real time goes into an accumulator and update() runs
+once per whole tick in it. render() gets alpha, the fraction of a tick left
+over, so it can draw positions interpolated between the last two ticks. A
+slow frame runs extra ticks to catch up instead of slowing the game down.
+
+run_headless() skips timing and rendering entirely and steps update() as
+fast as the CPU allows, for replays and training.
+
+IdleLoop is for the turn-based games, which only change on input: it
+sleeps in pygame.event.wait() and renders only after an event changed
+something, a timer tick (the 8x8 clock) or a step of a running AI player
+or tile animation, so an idle game uses no CPU. With a profiler it times
+the wait, events, step and render phases; a frame runs from one render
+to the next, so its time includes however long it slept for input.
+"""
+
+import math
+import time
+
+import pygame
+
+from profiler import NullProfiler
+
+
+class FixedTimestepLoop:
+    """Runs update(dt) at a fixed rate and render(alpha) once per frame."""
+
+    def __init__(self, update, render, tick_rate, handle_events=None, frame_limiter=None,
+                 max_frame_time=0.25, profiler=None):
+        self.update = update
+        self.render = render
+        self.dt = 1.0 / tick_rate
+        self.handle_events = handle_events
+        self.frame_limiter = frame_limiter
+        # Long stalls (window drags, breakpoints) are clamped so the game
+        # does not fast-forward through hundreds of ticks afterwards.
+        self.max_frame_time = max_frame_time
+        self.profiler = profiler or NullProfiler()
+        self.running = False
+        self.ticks = 0
+        self.frames = 0
+
+    def stop(self):
+        self.running = False
+
+    def run(self):
+        """Runs until stop() is called or handle_events() returns False."""
+        profiler = self.profiler
+        accumulator = 0.0
+        previous = time.perf_counter()
+        self.running = True
+        while self.running:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            accumulator += min(now - previous, self.max_frame_time)
+            previous = now
+
+            if self.handle_events:
+                with profiler.phase("events"):
+                    if self.handle_events() is False:
+                        self.running = False
+                        break
+
+            with profiler.phase("physics"):
+                while accumulator >= self.dt:
+                    self.update(self.dt)
+                    accumulator -= self.dt
+                    self.ticks += 1
+
+            # render() times its own draw/text/flip phases
+            self.render(accumulator / self.dt)
+            self.frames += 1
+
+            if self.frame_limiter:
+                self.frame_limiter()
+            profiler.end_frame()
+
+    def run_headless(self, ticks=None, until=None):
+        """Steps update() back to back with no rendering or waiting.
+
+        Stops after `ticks` ticks or when until() returns True; returns the
+        number of ticks run.
+        """
+        count = 0
+        while (ticks is None or count < ticks) and not (until and until()):
+            self.update(self.dt)
+            count += 1
+        self.ticks += count
+        return count
+
+
+def wait_events(timeout=None):
+    """Blocks until an event arrives or timeout ms pass; returns the pending events.
+
+    timeout None waits forever and 0 just polls. Returns [] on a timeout.
+    """
+    if timeout == 0:
+        return pygame.event.get()
+    event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+class IdleLoop:
+    """Renders only when something changed and sleeps in pygame.event.wait() otherwise.
+
+    handle_event(event) returns True if the screen needs redrawing. With an
+    interval (seconds), render() also runs on timer ticks at start +
+    k * interval. While busy() is true (an AI player), the loop polls
+    instead of waiting and calls step() (if given) once per pass, at most
+    busy_rate times a second if given.
+    """
+
+    def __init__(self, handle_event, render, interval=None, busy=None, step=None, busy_rate=None,
+                 profiler=None):
+        self.handle_event = handle_event
+        self.render = render
+        self.interval = interval
+        self.busy = busy or (lambda: False)
+        self.step = step
+        self.busy_rate = busy_rate
+        self.profiler = profiler or NullProfiler()
+        self.clock = pygame.time.Clock()
+        self.running = False
+        self.next_tick = None
+        self.frames = 0
+        self.wakeups = 0
+
+    def stop(self):
+        self.running = False
+
+    def timeout(self):
+        """Milliseconds to wait for input: None (forever), up to the next tick, or 0 while busy."""
+        if self.busy():
+            return 0
+        if self.next_tick is None:
+            return None
+        return max(0, math.ceil((self.next_tick - time.monotonic()) * 1000))
+
+    def _timer_due(self):
+        now = time.monotonic()
+        if self.next_tick is None or now < self.next_tick:
+            return False
+        # Ticks missed while busy are skipped, not replayed
+        self.next_tick += self.interval * (math.floor((now - self.next_tick) / self.interval) + 1)
+        return True
+
+    def run(self, start=None):
+        """Runs until stop() is called or the window is closed.
+
+        start is the time.monotonic() the timer counts from (default: now).
+        """
+        start = time.monotonic() if start is None else start
+        self.next_tick = start + self.interval if self.interval else None
+        profiler = self.profiler
+        self.running = True
+        changed = True
+        profiler.begin_frame()
+        while self.running:
+            if changed:
+                with profiler.phase("render"):
+                    self.render()
+                self.frames += 1
+                # Passes that render nothing are not frames; their time goes to the next one
+                profiler.end_frame()
+                profiler.begin_frame()
+                changed = False
+
+            with profiler.phase("wait"):
+                events = wait_events(self.timeout())
+            self.wakeups += 1
+            with profiler.phase("events"):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        self.stop()
+                    elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                        pygame.display.flip()  # The screen surface is intact, just not on screen
+                    elif self.handle_event(event):
+                        changed = True
+            if not self.running:
+                break
+
+            if self.busy():
+                if self.step:
+                    with profiler.phase("step"):
+                        self.step()
+                changed = True
+                if self.busy_rate:
+                    with profiler.phase("wait"):
+                        self.clock.tick(self.busy_rate)
+            if self._timer_due():
+                changed = True
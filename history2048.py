@@ -0,0 +1,228 @@
+"""Unlimited undo/redo with branching timelines for the bitboard 2048 games.
+
+Every state a game passes through is a node in a tree: a move adds a child
+of the current node, undo steps to the parent and redo to a child. Making a
+move after an undo starts a new branch and keeps the old future, so any
+timeline can be returned to later.
+
+Nodes are not boards. A node is one packed delta in an array - the
+direction and the tile spawned after it - plus its parent, depth,
+preferred redo child and first child and next sibling (so a node's branches
+are found without scanning the tree), 24 bytes in all. Every CHECKPOINT_EVERY moves along a
+path the full packed board and score are kept as well, and any state is
+rebuilt from the nearest checkpoint above it by replaying at most that many
+deltas through the row tables (a few microseconds each). Nothing here
+depends on the rng, so undoing and redoing never changes what a game draws
+next.
+
+The current node doubles as a version number: it changes exactly when a
+move, undo or redo changes the state, an O(1) test for "did this key
+press change anything" that needs no copy of the previous grid.
+
+Running this module compares the memory per move with keeping a deep copy
+of the grid (the old undo stack) and one packed int per state.
+"""
+
+from array import array
+
+from bitboard import DIRECTIONS
+
+ROOT = 0
+NO_CHILD = -1
+
+
+class BoardHistory:
+    """A tree of 2048 states stored as packed move deltas."""
+
+    CHECKPOINT_EVERY = 32
+
+    def __init__(self, tables, board, score=0):
+        self.tables = tables
+        self.cell_bits = max(1, (tables.cells - 1).bit_length())
+        self.parent = array("i", [NO_CHILD])
+        self.delta = array("I", [0])
+        self.depth = array("I", [0])
+        self.redo_child = array("i", [NO_CHILD])  # The branch redo() follows
+        # Each node's children as a linked list, newest first
+        self.first_child = array("i", [NO_CHILD])
+        self.next_sibling = array("i", [NO_CHILD])
+        self.checkpoints = {ROOT: (board, score)}
+        self.node = ROOT
+
+    def __len__(self):
+        return len(self.parent)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the node arrays and checkpoint boards (not Python overhead)."""
+        arrays = sum(a.itemsize * len(a) for a in (self.parent, self.delta, self.depth, self.redo_child,
+                                                   self.first_child, self.next_sibling))
+        boards = sum((board.bit_length() + 7) // 8 + 8 for board, _ in self.checkpoints.values())
+        return arrays + boards
+
+    def _pack(self, direction, spawn):
+        """direction index | spawn cell | spawn exponent (0 = no tile spawned)."""
+        if spawn is None:
+            return DIRECTIONS.index(direction)
+        index, value = spawn
+        exponent = value.bit_length() - 1
+        return DIRECTIONS.index(direction) | (index << 2) | (exponent << (2 + self.cell_bits))
+
+    def record(self, direction, spawn, board, score):
+        """Adds the state after a move as a child of the current node and moves to it.
+
+        spawn is the (cell index, value) of the tile spawned after the
+        slide, or None; board and score are the resulting state.
+        """
+        parent = self.node
+        node = len(self.parent)
+        depth = self.depth[parent] + 1
+        self.parent.append(parent)
+        self.delta.append(self._pack(direction, spawn))
+        self.depth.append(depth)
+        self.redo_child.append(NO_CHILD)
+        self.redo_child[parent] = node
+        self.first_child.append(NO_CHILD)
+        self.next_sibling.append(self.first_child[parent])
+        self.first_child[parent] = node
+        if depth % self.CHECKPOINT_EVERY == 0:
+            self.checkpoints[node] = (board, score)
+        self.node = node
+        return node
+
+    def direction(self, node):
+        """The direction of the move that led to node (None for the root)."""
+        return None if node == ROOT else DIRECTIONS[self.delta[node] & 3]
+
+    def apply(self, node, board, score):
+        """Plays the move that led to node on its parent's (board, score)."""
+        delta = self.delta[node]
+        board, gained = self.tables.move(board, DIRECTIONS[delta & 3])
+        exponent = delta >> (2 + self.cell_bits)
+        if exponent:
+            index = (delta >> 2) & ((1 << self.cell_bits) - 1)
+            board |= exponent << (index * self.tables.bits)
+        return board, score + gained
+
+    def state(self, node=None):
+        """Rebuilds (board, score, moves) for a node (default: the current one)."""
+        node = self.node if node is None else node
+        path = []
+        while node not in self.checkpoints:
+            path.append(node)
+            node = self.parent[node]
+        board, score = self.checkpoints[node]
+        for step in reversed(path):
+            board, score = self.apply(step, board, score)
+        return board, score, self.depth[node] + len(path)
+
+    def undo(self):
+        """Steps back to the parent; returns its node, or None at the root."""
+        if self.node == ROOT:
+            return None
+        parent = self.parent[self.node]
+        self.redo_child[parent] = self.node  # Redo comes back down this branch
+        self.node = parent
+        return parent
+
+    def redo(self):
+        """Steps forward along the chosen branch; returns its node, or None if there is none."""
+        child = self.redo_child[self.node]
+        if child == NO_CHILD:
+            return None
+        self.node = child
+        return child
+
+    def branches(self, node=None):
+        """The children of a node (default: the current one), oldest first."""
+        node = self.node if node is None else node
+        children = []
+        child = self.first_child[node]
+        while child != NO_CHILD:
+            children.append(child)
+            child = self.next_sibling[child]
+        children.reverse()
+        return children
+
+    def next_branch(self):
+        """Points redo() at the next sibling branch; returns it, or None if there is none."""
+        branches = self.branches()
+        if not branches:
+            return None
+        current = self.redo_child[self.node]
+        child = branches[(branches.index(current) + 1) % len(branches)] if current in branches else branches[0]
+        self.redo_child[self.node] = child
+        return child
+
+
+def _benchmark(moves=20_000):
+    import sys
+    import time
+    import tracemalloc
+
+    from game2048 import AdaptiveGame, SplitMix64
+
+    def grid_bytes(grid):
+        return sys.getsizeof(grid) + sum(sys.getsizeof(row) for row in grid)
+
+    game = AdaptiveGame(seed=1)
+    rng = SplitMix64(1)
+    tracemalloc.start()
+    copies = ints = 0
+    while game.moves < moves and not game.check_game_over():
+        if not game.move(DIRECTIONS[int(rng.random() * 4)]):
+            continue
+        copies += grid_bytes(game.grid)
+        ints += sys.getsizeof(game.board) + 8  # The int and a list slot for it
+    # Only what this module allocated (the 8x8 row tables also grow meanwhile)
+    traces = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, __file__)])
+    history_bytes = sum(stat.size for stat in traces.statistics("filename"))
+    tracemalloc.stop()
+    history = game.history
+    count = len(history) - 1
+    print(f"{count} moves on the {game.size}x{game.size} adaptive board")
+    print(f"{'deep-copied grids':<22} {copies / count:8.1f} bytes/move")
+    print(f"{'one packed int each':<22} {ints / count:8.1f} bytes/move")
+    print(f"{'history (arrays)':<22} {history.nbytes / count:8.1f} bytes/move")
+    print(f"{'history (traced)':<22} {history_bytes / count:8.1f} bytes/move")
+
+    start = time.perf_counter()
+    while game.undo():
+        pass
+    undo_time = time.perf_counter() - start
+    start = time.perf_counter()
+    while game.redo():
+        pass
+    redo_time = time.perf_counter() - start
+    print(f"undo all the way back: {undo_time / count * 1e6:.1f} us/step, "
+          f"redo to the end: {redo_time / count * 1e6:.1f} us/step")
+
+
+def _check(steps=5000):
+    """Random moves, undos, redos and branch switches against a plain list of states."""
+    from game2048 import AdaptiveGame, SplitMix64
+
+    game = AdaptiveGame(seed=7)
+    rng = SplitMix64(9)
+    states = {game.history.node: (game.board, game.score, game.moves)}
+    for _ in range(steps):
+        roll = rng.random()
+        if roll < 0.6:
+            game.move(DIRECTIONS[int(rng.random() * 4)])
+        elif roll < 0.8:
+            game.undo()
+        elif roll < 0.95:
+            game.redo()
+        else:
+            game.next_branch()
+            game.redo()
+        node = game.history.node
+        state = (game.board, game.score, game.moves)
+        assert states.setdefault(node, state) == state, node
+        assert game.history.state() == state
+    return len(game.history)
+
+
+if __name__ == "__main__":
+    print(f"{_check()} states checked")
+    _benchmark()
@@ -0,0 +1,291 @@
+"""Display-free state for the minefield game (new game.py).
+
+Minefield holds the mines as a NumPy bool grid and a precomputed grid of
+neighbour counts ("danger"). The counts are built once per generate() with
+eight shifted array adds and patched in place when a single mine is added
+or removed, so looking one up is an array index instead of eight set
+lookups. Arrays are indexed [y, x].
+
+ChunkedMinefield has the same interface for boards far too big to hold in
+memory. It generates mines one square chunk at a time from a hash of the
+chunk coordinates, so any chunk can be rebuilt after it was dropped, and
+keeps the chunks near the player in a pair of LRU caches.
+
+MinefieldGame is the player on top of a field: moving, hitting a mine,
+reaching the goal and restarting.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from minesolver import path_exists, shortest_path
+
+NEIGHBOURS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def count_padded(padded):
+    """Neighbour counts for the inside of a grid that already has a one-cell border."""
+    rows, cols = padded.shape[0] - 2, padded.shape[1] - 2
+    padded = padded.astype(np.uint8)
+    danger = np.zeros((rows, cols), dtype=np.uint8)
+    for dx, dy in NEIGHBOURS:
+        danger += padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+    return danger
+
+
+def count_neighbours(mines):
+    """Returns the number of mines around every cell of a bool grid."""
+    return count_padded(np.pad(mines, 1))
+
+
+class Minefield:
+    """A cols x rows board of mines with cached neighbour counts."""
+
+    MAX_ATTEMPTS = 1000
+
+    def __init__(self, cols=10, rows=10, num_mines=15, seed=None, require_path=True):
+        self.cols = cols
+        self.rows = rows
+        self.num_mines = num_mines
+        self.require_path = require_path
+        self.start = (0, 0)
+        self.goal = (cols - 1, rows - 1)
+        self.rng = np.random.default_rng(seed)
+        self.version = 0  # Bumped on every change so views know to redraw
+        self.generate()
+
+    def generate(self):
+        """Places num_mines mines at random, never on the start or goal.
+
+        With require_path, layouts that wall the goal off from the start are
+        thrown away and drawn again.
+        """
+        free = np.ones(self.cols * self.rows, dtype=bool)
+        for x, y in (self.start, self.goal):
+            free[y * self.cols + x] = False
+        free = np.flatnonzero(free)
+        for _ in range(self.MAX_ATTEMPTS):
+            cells = self.rng.choice(free, size=self.num_mines, replace=False)
+            self.mines = np.zeros((self.rows, self.cols), dtype=bool)
+            self.mines.flat[cells] = True
+            if not self.require_path or path_exists(self.mines, self.start, self.goal):
+                break
+        else:
+            raise ValueError(f"no solvable layout with {self.num_mines} mines on {self.cols}x{self.rows}")
+        self.danger = count_neighbours(self.mines)
+        self.version += 1
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def is_mine(self, x, y):
+        return bool(self.mines[y, x])
+
+    def count_nearby_mines(self, x, y):
+        return int(self.danger[y, x])
+
+    def danger_region(self, x, y, width, height):
+        """Returns the neighbour counts of a rectangle of cells as an array."""
+        return self.danger[y:y + height, x:x + width]
+
+    def mines_in_region(self, x, y, width, height):
+        """Returns (x, y) of every mine inside a rectangle of cells."""
+        ys, xs = np.nonzero(self.mines[y:y + height, x:x + width])
+        return list(zip((xs + x).tolist(), (ys + y).tolist()))
+
+    def safe_path(self, start=None):
+        """Shortest list of safe (x, y) cells from start (default: the start cell) to the goal."""
+        return shortest_path(self.mines, start or self.start, self.goal)
+
+    def _update_danger(self, x, y, delta):
+        region = self.danger[max(y - 1, 0):y + 2, max(x - 1, 0):x + 2]
+        if delta > 0:
+            region += 1
+            self.danger[y, x] -= 1  # A cell is not its own neighbour
+        else:
+            self.danger[y, x] += 1
+            region -= 1
+
+    def add_mine(self, x, y):
+        """Places a mine and bumps the counts of its eight neighbours."""
+        if self.mines[y, x]:
+            return
+        self.mines[y, x] = True
+        self._update_danger(x, y, +1)
+        self.version += 1
+
+    def remove_mine(self, x, y):
+        """Removes a mine and lowers the counts of its eight neighbours."""
+        if not self.mines[y, x]:
+            return
+        self.mines[y, x] = False
+        self._update_danger(x, y, -1)
+        self.version += 1
+
+
+class ChunkedMinefield:
+    """A huge board whose mines are generated lazily, chunk by chunk.
+
+    Every cell other than the start and goal holds a mine with probability
+    `density`. A chunk's mines depend only on the board seed and the chunk
+    coordinates, so chunks are evicted least-recently-used once more than
+    `max_chunks` are cached and regenerated identically when the player
+    comes back. Danger counts are computed per chunk from its mines plus a
+    one-cell border taken from the neighbouring chunks, so counts along
+    chunk edges are the same as on a board generated in one piece. Memory
+    is bounded by max_chunks however far the player walks.
+    """
+
+    def __init__(self, cols=1_000_000, rows=1_000_000, density=0.15, seed=None,
+                 chunk_size=64, max_chunks=256):
+        self.cols = cols
+        self.rows = rows
+        self.density = density
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.start = (0, 0)
+        self.goal = (cols - 1, rows - 1)
+        self.rng = np.random.default_rng(seed)
+        self.edits = {}  # (x, y) -> bool for mines added or removed by hand
+        self.version = 0
+        self.generate()
+
+    def generate(self):
+        """Starts a new board by picking a new seed for every chunk."""
+        self.board_seed = int(self.rng.integers(2 ** 63))
+        self.mine_chunks = OrderedDict()
+        self.danger_chunks = OrderedDict()
+        self.edits.clear()
+        self.version += 1
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def _cached(self, cache, key, build):
+        chunk = cache.get(key)
+        if chunk is None:
+            chunk = cache[key] = build(*key)
+            if len(cache) > self.max_chunks:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return chunk
+
+    def _build_mines(self, cx, cy):
+        size = self.chunk_size
+        x0, y0 = cx * size, cy * size
+        if cx < 0 or cy < 0 or x0 >= self.cols or y0 >= self.rows:
+            return np.zeros((size, size), dtype=bool)
+        rng = np.random.default_rng([self.board_seed, cx, cy])
+        mines = rng.random((size, size)) < self.density
+        mines[:, max(self.cols - x0, 0):] = False  # Cells past the board edge
+        mines[max(self.rows - y0, 0):, :] = False
+        for x, y in (self.start, self.goal):  # Avoid start & goal
+            if x0 <= x < x0 + size and y0 <= y < y0 + size:
+                mines[y - y0, x - x0] = False
+        for (x, y), mine in self.edits.items():
+            if x0 <= x < x0 + size and y0 <= y < y0 + size:
+                mines[y - y0, x - x0] = mine
+        return mines
+
+    def _build_danger(self, cx, cy):
+        size = self.chunk_size
+        padded = self._region(self._mine_chunk, cx * size - 1, cy * size - 1, size + 2, size + 2, bool)
+        return count_padded(padded)
+
+    def _mine_chunk(self, cx, cy):
+        return self._cached(self.mine_chunks, (cx, cy), self._build_mines)
+
+    def _danger_chunk(self, cx, cy):
+        return self._cached(self.danger_chunks, (cx, cy), self._build_danger)
+
+    def _region(self, chunk, x, y, width, height, dtype):
+        """Copies a rectangle of cells out of the chunks that cover it."""
+        size = self.chunk_size
+        out = np.zeros((height, width), dtype=dtype)
+        for cy in range(y // size, (y + height - 1) // size + 1):
+            top, bottom = max(y, cy * size), min(y + height, (cy + 1) * size)
+            for cx in range(x // size, (x + width - 1) // size + 1):
+                left, right = max(x, cx * size), min(x + width, (cx + 1) * size)
+                out[top - y:bottom - y, left - x:right - x] = \
+                    chunk(cx, cy)[top - cy * size:bottom - cy * size, left - cx * size:right - cx * size]
+        return out
+
+    def is_mine(self, x, y):
+        size = self.chunk_size
+        return bool(self._mine_chunk(x // size, y // size)[y % size, x % size])
+
+    def count_nearby_mines(self, x, y):
+        size = self.chunk_size
+        return int(self._danger_chunk(x // size, y // size)[y % size, x % size])
+
+    def danger_region(self, x, y, width, height):
+        """Returns the neighbour counts of a rectangle of cells as an array."""
+        return self._region(self._danger_chunk, x, y, width, height, np.uint8)
+
+    def mines_in_region(self, x, y, width, height):
+        """Returns (x, y) of every mine inside a rectangle of cells."""
+        ys, xs = np.nonzero(self._region(self._mine_chunk, x, y, width, height, bool))
+        return list(zip((xs + x).tolist(), (ys + y).tolist()))
+
+    def _set_mine(self, x, y, mine):
+        if self.is_mine(x, y) == mine:
+            return
+        size = self.chunk_size
+        self.edits[x, y] = mine
+        self._mine_chunk(x // size, y // size)[y % size, x % size] = mine
+        # The counts of every chunk touching the 3x3 block are rebuilt on demand
+        for cy in {(y - 1) // size, y // size, (y + 1) // size}:
+            for cx in {(x - 1) // size, x // size, (x + 1) // size}:
+                self.danger_chunks.pop((cx, cy), None)
+        self.version += 1
+
+    def add_mine(self, x, y):
+        self._set_mine(x, y, True)
+
+    def remove_mine(self, x, y):
+        self._set_mine(x, y, False)
+
+
+def make_field(cols=10, rows=10, mines=None, chunked=False, seed=None):
+    """Builds the board new game.py plays on; mines defaults to 15% of the cells."""
+    if chunked:
+        density = mines / (rows * cols) if mines is not None else 0.15
+        return ChunkedMinefield(cols, rows, density, seed=seed)
+    num_mines = mines if mines is not None else round(rows * cols * 0.15)
+    return Minefield(cols, rows, num_mines, seed=seed)
+
+
+class MinefieldGame:
+    """Player position and win/lose state on a minefield."""
+
+    def __init__(self, field):
+        self.field = field
+        self.restart(regenerate=False)
+
+    def restart(self, regenerate=True):
+        if regenerate:
+            self.field.generate()
+        self.player_x, self.player_y = self.field.start
+        self.game_over = False  # False, True (hit a mine) or "win"
+        self.moves = 0
+
+    def move(self, dx, dy):
+        """Moves the player one cell if the board allows it; returns True if it moved."""
+        if self.game_over:
+            return False
+        x, y = self.player_x + dx, self.player_y + dy
+        if not self.field.in_bounds(x, y):
+            return False
+        self.player_x, self.player_y = x, y
+        self.moves += 1
+
+        # Check for mine
+        if self.field.is_mine(x, y):
+            self.game_over = True
+
+        # Check for goal
+        if (x, y) == self.field.goal:
+            self.game_over = "win"
+        return True
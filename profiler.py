@@ -0,0 +1,182 @@
+"""Frame-time profiling for the game loops.
+
+A game loop opts in with
+
+    profiler = profiler_from_env()
+    while running:
+        profiler.begin_frame()
+        with profiler.phase("events"):
+            ...
+        with profiler.phase("physics"):
+            ...
+        profiler.draw_overlay(screen)
+        profiler.end_frame()
+
+Profiling is off unless GAME_PROFILE is set, in which case the loop gets a
+FrameProfiler instead of the no-op NullProfiler. GAME_PROFILE may name a
+.csv or .json file that the recorded frames are written to at exit. The
+overlay (FPS, p50/p99 frame time, per-phase averages) toggles with F3.
+
+The loops in gameloop.py take the profiler as an argument and do the
+begin/end_frame and phase calls themselves, so a game only has to pass
+events to handle_event() and draw the overlay in its render().
+"""
+
+import atexit
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+
+def percentile(sorted_values, fraction):
+    """Returns the value at `fraction` (0-1) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """Records per-frame and per-phase timings into a fixed-size ring buffer."""
+
+    OVERLAY_REFRESH = 0.25  # seconds between overlay text updates
+
+    def __init__(self, capacity=3600, dump_path=None, overlay=True):
+        self.frames = deque(maxlen=capacity)
+        self.phase_names = []
+        self.overlay = overlay
+        self.dump_path = dump_path
+        self._frame_start = None
+        self._phases = {}
+        self._overlay_lines = []
+        self._overlay_surfaces = []
+        self._overlay_time = 0.0
+        if dump_path:
+            atexit.register(self.dump, dump_path)
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter()
+        self._phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block and adds it to the current frame."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._phases[name] = self._phases.get(name, 0.0) + elapsed
+            if name not in self.phase_names:
+                self.phase_names.append(name)
+
+    def end_frame(self):
+        if self._frame_start is None:
+            return
+        self.frames.append((time.perf_counter() - self._frame_start, self._phases))
+        self._frame_start = None
+
+    def handle_event(self, event):
+        """Toggles the overlay on F3; safe to call with every event.
+
+        Returns True when it toggled, so loops that only redraw on change
+        know to repaint.
+        """
+        import pygame
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.overlay = not self.overlay
+            return True
+        return False
+
+    def summary(self):
+        """Returns fps, p50/p99 frame time (ms) and mean ms per phase over the buffer."""
+        times = sorted(frame_time for frame_time, _ in self.frames)
+        total = sum(times)
+        phases = {}
+        for name in self.phase_names:
+            phases[name] = 1000.0 * sum(p.get(name, 0.0) for _, p in self.frames) / max(len(self.frames), 1)
+        return {
+            "frames": len(times),
+            "fps": len(times) / total if total else 0.0,
+            "p50_ms": 1000.0 * percentile(times, 0.50),
+            "p99_ms": 1000.0 * percentile(times, 0.99),
+            "phases_ms": phases,
+        }
+
+    def draw_overlay(self, screen, position=(5, 5), color=(255, 255, 0)):
+        """Draws the stats in a corner of `screen`; returns the touched rect or None."""
+        if not self.overlay:
+            return None
+        import pygame
+
+        from textcache import render_text
+        now = time.perf_counter()
+        if now - self._overlay_time > self.OVERLAY_REFRESH:
+            self._overlay_time = now
+            stats = self.summary()
+            lines = [f"{stats['fps']:.0f} fps  p50 {stats['p50_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms"]
+            lines += [f"{name}: {ms:.2f} ms" for name, ms in stats["phases_ms"].items()]
+            if lines != self._overlay_lines:
+                self._overlay_lines = lines
+                self._overlay_surfaces = [render_text(line, 20, color, background=(0, 0, 0)) for line in lines]
+        x, y = position
+        rect = pygame.Rect(x, y, 0, 0)
+        for surface in self._overlay_surfaces:
+            rect.union_ip(screen.blit(surface, (x, y)))
+            y += surface.get_height()
+        return rect
+
+    def rows(self):
+        """Yields one dict per recorded frame (times in ms)."""
+        for index, (frame_time, phases) in enumerate(self.frames):
+            row = {"frame": index, "frame_ms": 1000.0 * frame_time}
+            for name in self.phase_names:
+                row[name + "_ms"] = 1000.0 * phases.get(name, 0.0)
+            yield row
+
+    def dump(self, path):
+        """Writes the recorded frames as CSV, or JSON (with a summary) for .json paths."""
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({"summary": self.summary(), "frames": list(self.rows())}, file, indent=1)
+            return
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, ["frame", "frame_ms"] + [name + "_ms" for name in self.phase_names])
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def end_frame(self):
+        pass
+
+    def handle_event(self, event):
+        return False
+
+    def draw_overlay(self, screen, position=(5, 5), color=(255, 255, 0)):
+        return None
+
+
+def profiler_from_env(variable="GAME_PROFILE"):
+    """Returns a FrameProfiler if the environment variable is set, else a NullProfiler.
+
+    A value ending in .csv or .json is used as the dump file.
+    """
+    value = os.environ.get(variable)
+    if not value:
+        return NullProfiler()
+    dump_path = value if value.endswith((".csv", ".json")) else None
+    return FrameProfiler(dump_path=dump_path)
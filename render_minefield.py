@@ -0,0 +1,129 @@
+"""Cached, scrolling rendering for the minefield game.
+
+MinefieldView draws a window of view_cols x view_rows cells. The danger
+coloring and grid lines of that window are rendered into one background
+surface (a palette lookup on the field's neighbour counts, scaled up with
+a single transform) and only rebuilt when the camera scrolls or the mines
+change. A normal frame restores the cell the player left from that
+background and draws the player and goal on top, so a move touches two
+cells instead of repainting the whole board.
+
+The camera follows the player, so boards far bigger than the window
+(1000 x 1000 and up) cost the same per frame as the 10 x 10 default.
+"""
+
+import numpy as np
+import pygame
+
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 255)  # Player
+GREEN = (0, 255, 0)  # Goal
+RED = (255, 0, 0)  # Mines
+LIGHT_RED = (255, 102, 102)  # High danger
+ORANGE = (255, 165, 0)  # Medium danger
+YELLOW = (255, 255, 0)  # Low danger
+GRAY = (200, 200, 200)  # Grid
+
+# Cell color by number of nearby mines; 3 or more is high danger
+DANGER_COLORS = np.array([WHITE, YELLOW, ORANGE] + [LIGHT_RED] * 6, dtype=np.uint8)
+
+
+class MinefieldView:
+    """Draws the part of a minefield around the player, redrawing only what moved."""
+
+    def __init__(self, screen, field, cell_size, view_cols, view_rows, origin=(0, 0)):
+        self.screen = screen
+        self.field = field
+        self.cell_size = cell_size
+        self.view_cols = min(view_cols, field.cols)
+        self.view_rows = min(view_rows, field.rows)
+        self.origin = origin
+        self.rect = pygame.Rect(origin, (self.view_cols * cell_size, self.view_rows * cell_size))
+        self.grid_lines = self._grid_lines()
+        self.background = None
+        self.camera = (0, 0)
+        self.shown = None  # (camera, field version, game_over) of the background on screen
+        self.shown_player = None
+
+    def _grid_lines(self):
+        """Grid borders for the whole window, drawn once with a colorkey."""
+        key = (255, 0, 255)
+        surface = pygame.Surface(self.rect.size).convert()
+        surface.fill(key)
+        for row in range(self.view_rows):
+            for col in range(self.view_cols):
+                rect = (col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+                pygame.draw.rect(surface, GRAY, rect, 1)
+        surface.set_colorkey(key, pygame.RLEACCEL)
+        return surface
+
+    def follow(self, x, y):
+        """Centers the camera on cell (x, y), clamped to the board edges."""
+        cam_x = min(max(x - self.view_cols // 2, 0), self.field.cols - self.view_cols)
+        cam_y = min(max(y - self.view_rows // 2, 0), self.field.rows - self.view_rows)
+        self.camera = (cam_x, cam_y)
+
+    def render_background(self):
+        """Renders danger colors and grid lines for the cells under the camera."""
+        cam_x, cam_y = self.camera
+        danger = self.field.danger_region(cam_x, cam_y, self.view_cols, self.view_rows)
+        pixels = DANGER_COLORS[np.minimum(danger, len(DANGER_COLORS) - 1)].transpose(1, 0, 2)
+        cells = pygame.surfarray.make_surface(np.ascontiguousarray(pixels))
+        background = pygame.transform.scale(cells, self.rect.size).convert()
+        background.blit(self.grid_lines, (0, 0))
+        self.background = background
+
+    def cell_rect(self, x, y):
+        """Screen rect of board cell (x, y), or None if it is outside the window."""
+        col, row = x - self.camera[0], y - self.camera[1]
+        if not (0 <= col < self.view_cols and 0 <= row < self.view_rows):
+            return None
+        return pygame.Rect(self.origin[0] + col * self.cell_size, self.origin[1] + row * self.cell_size,
+                           self.cell_size, self.cell_size)
+
+    def invalidate(self):
+        """Forces a full redraw on the next draw()."""
+        self.shown = None
+
+    def _draw_mines(self):
+        cam_x, cam_y = self.camera
+        for x, y in self.field.mines_in_region(cam_x, cam_y, self.view_cols, self.view_rows):
+            rect = self.cell_rect(x, y)
+            pygame.draw.circle(self.screen, RED, rect.center, self.cell_size // 3)
+
+    def draw(self, game):
+        """Brings the window up to date with the game; returns the dirty rects."""
+        self.follow(game.player_x, game.player_y)
+        player = (game.player_x, game.player_y)
+        state = (self.camera, self.field.version, game.game_over)
+        dirty = []
+        if state != self.shown:
+            if self.shown is None or state[:2] != self.shown[:2]:
+                self.render_background()
+            self.screen.blit(self.background, self.origin)
+            # Draw mines if game over
+            if game.game_over:
+                self._draw_mines()
+            self.shown = state
+            dirty.append(self.rect)
+        elif player != self.shown_player:
+            # Put back the cell the player left
+            rect = self.cell_rect(*self.shown_player)
+            if rect:
+                self.screen.blit(self.background, rect, rect.move(-self.origin[0], -self.origin[1]))
+                dirty.append(rect)
+        else:
+            return dirty
+
+        # Draw goal
+        goal = self.cell_rect(*self.field.goal)
+        if goal:
+            pygame.draw.rect(self.screen, GREEN, goal)
+            dirty.append(goal)
+
+        # Draw player
+        rect = self.cell_rect(*player)
+        pygame.draw.rect(self.screen, BLUE, rect)
+        dirty.append(rect)
+        self.shown_player = player
+        return dirty
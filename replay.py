@@ -0,0 +1,361 @@
+"""Compact input recordings and fast headless playback for every game.
+
+A replay is the rng seed plus the stream of inputs the game consumed,
+which is enough to rebuild any game exactly because every simulation
+draws only from its seeded rng. The file layout is
+
+    b"RPLY" 2                       magic and format version
+    varint n, n bytes of JSON       {"game", "seed", "params"}
+    varint (run << 4 | code) ...    input code repeated `run` times
+    varint 0, 8-byte state digest,  end marker, written by close()
+    varint total inputs
+
+Arcade games record one code per physics tick (LEFT | RIGHT | JUMP |
+RESTART bits), so a key held for a second is one or two bytes. The turn
+based games record one code per move. Runs are written as they end, so a
+recording is streamed to disk and a crash only loses the final digest.
+ReplayReader memory-maps the file and decodes runs lazily.
+
+Format 1 files were recorded before the arcade games swept collisions and
+kept the basket and paddle on screen; they are played back with both
+turned off (arcade.py), so their digests still match. Format 1
+2048-adaptive files without REDO or NEXT_BRANCH codes predate the undo
+history (history2048): their UNDO restored one of the last five boards
+and kept the score and move count, and that is how they are played back.
+The new undo only ever wrote REDO and NEXT_BRANCH alongside, and format 2
+came after it, so every other UNDO rewinds the whole state.
+
+Running this module replays files headlessly, checks the final state
+digest and prints how many times faster than real time it ran:
+
+    GAME_REPLAY=run.rply python pong.py
+    python replay.py run.rply
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque, namedtuple
+
+from arcade import EggSim, FlappySim, PongSim
+from bitboard import DIRECTIONS
+from game2048 import AdaptiveGame, ClassicGame, TripleMergeGame
+from minefield import MinefieldGame, make_field
+
+MAGIC = b"RPLY"
+VERSION = 2
+CODE_BITS = 4
+
+# Arcade input bits
+LEFT, RIGHT, JUMP, RESTART = 1, 2, 4, 8
+# Turn-based codes past the four DIRECTIONS indexes
+UNDO, REDO, NEXT_BRANCH = 4, 5, 6  # 2048_8x8grid.py
+MINE_RESTART = 4  # new game.py
+
+
+def write_varint(out, value):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Decodes the varint at data[pos]; returns (value, next position).
+
+    value is None if the data ends before the varint does.
+    """
+    end = len(data)
+    value = shift = 0
+    while pos < end:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+    return None, pos
+
+
+def digest(*state):
+    """8-byte hash of a tuple of plain values and byte strings."""
+    return hashlib.blake2b(repr(state).encode(), digest_size=8).digest()
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), "little") >> 1
+
+
+# Games: how to rebuild one from a seed, apply one input code and hash it
+ReplayGame = namedtuple("ReplayGame", "create step state tick_rate")
+
+
+def _format_1_physics(sim):
+    """Plays a format 1 arcade recording with the physics it was recorded with."""
+    sim.swept = False
+    sim.clamped = False
+
+
+def _format_1_undo(game):
+    """Step function for a format 1 adaptive recording made with the old undo."""
+    game.history = None  # The tree would not follow the boards restored here
+    boards = deque(maxlen=5)
+
+    def step(game, code):
+        if code == UNDO:
+            if boards:
+                game.board = boards.pop()
+        else:
+            previous = game.board
+            if game.move(DIRECTIONS[code]):
+                boards.append(previous)
+    return step
+
+
+def _step_flappy(sim, code):
+    if code & RESTART and sim.game_over:
+        sim.reset()
+    sim.step(jump=bool(code & JUMP))
+
+
+def _step_held(sim, code):
+    if code & RESTART and sim.game_over:
+        sim.reset()
+    sim.step(left=bool(code & LEFT), right=bool(code & RIGHT))
+
+
+def _step_2048(game, code):
+    if code == UNDO:
+        game.undo()
+    elif code == REDO:
+        game.redo()
+    elif code == NEXT_BRANCH:
+        game.next_branch()
+    else:
+        game.move(DIRECTIONS[code])
+
+
+MINE_MOVES = ((-1, 0), (1, 0), (0, -1), (0, 1))  # In DIRECTIONS order
+
+
+def _step_minefield(game, code):
+    if code == MINE_RESTART:
+        game.restart()
+    else:
+        game.move(*MINE_MOVES[code])
+
+
+def _minefield_state(game):
+    field = game.field
+    board = field.mines.tobytes() if hasattr(field, "mines") else (field.board_seed, sorted(field.edits.items()))
+    return digest(game.player_x, game.player_y, game.game_over, game.moves, board)
+
+
+GAMES = {
+    "flappy": ReplayGame(
+        lambda seed, params: FlappySim(seed), _step_flappy,
+        lambda sim: digest(sim.bird_y, sim.velocity, [(int(p.x), p.top) for p in sim.pipes],
+                           sim.score, sim.game_over, sim.ticks),
+        FlappySim.TICK_RATE),
+    "egg": ReplayGame(
+        lambda seed, params: EggSim(seed), _step_held,
+        lambda sim: digest(sim.basket_x, [(e.x, int(e.y), e.speed) for e in sim.eggs],
+                           sim.score, sim.lives, sim.ticks),
+        EggSim.TICK_RATE),
+    "pong": ReplayGame(
+        lambda seed, params: PongSim(seed, **params), _step_held,
+        lambda sim: digest(sim.paddle_x, sim.score, sim.lives, sim.ticks,
+                           *(getattr(sim.balls, name).tobytes() for name in sim.balls.FIELDS)),
+        PongSim.TICK_RATE),
+    "2048-classic": ReplayGame(
+        lambda seed, params: ClassicGame(seed), _step_2048,
+        lambda game: digest(game.board, game.score, game.moves), None),
+    "2048-adaptive": ReplayGame(
+        lambda seed, params: AdaptiveGame(seed, **params), _step_2048,
+        lambda game: digest(game.board, game.score, game.moves), None),
+    "2048-triple": ReplayGame(
+        lambda seed, params: TripleMergeGame(seed), _step_2048,
+        lambda game: digest(game.grid, game.score), None),
+    "minefield": ReplayGame(
+        lambda seed, params: MinefieldGame(make_field(seed=seed, **params)), _step_minefield,
+        _minefield_state, None),
+}
+
+
+class ReplayWriter:
+    """Streams a game's input codes to a replay file as they happen."""
+
+    def __init__(self, path, game, seed=None, params=None):
+        self.path = path
+        self.game = game
+        self.seed = new_seed() if seed is None else seed
+        self.params = params or {}
+        self.file = open(path, "wb")
+        header = json.dumps({"game": game, "seed": self.seed, "params": self.params}).encode()
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        write_varint(out, len(header))
+        self.file.write(out + header)
+        self.code = None
+        self.run = 0
+        self.total = 0
+
+    def _flush_run(self):
+        if self.run:
+            out = bytearray()
+            write_varint(out, self.run << CODE_BITS | self.code)
+            self.file.write(out)
+
+    def record(self, code):
+        """Records one tick (arcade) or one move (turn-based) of input."""
+        self.total += 1
+        if code == self.code:
+            self.run += 1
+            return
+        self._flush_run()
+        self.code, self.run = code, 1
+
+    def close(self, game):
+        """Writes the end marker with the digest of the game's final state."""
+        if self.file.closed:
+            return
+        self._flush_run()
+        out = bytearray([0])
+        out += GAMES[self.game].state(game)
+        write_varint(out, self.total)
+        self.file.write(out)
+        self.file.close()
+
+
+class NullRecorder:
+    """Stand-in used when recording is off; seed None keeps games unseeded."""
+
+    seed = None
+
+    def record(self, code):
+        pass
+
+    def close(self, game):
+        pass
+
+
+def recorder_from_env(game, params=None, seed=None, variable="GAME_REPLAY"):
+    """Returns a ReplayWriter to the file named by the environment variable, else a NullRecorder.
+
+    The writer picks a random seed unless one is given; the game must be
+    built from recorder.seed.
+    """
+    path = os.environ.get(variable)
+    if not path:
+        return NullRecorder()
+    return ReplayWriter(path, game, seed, params)
+
+
+class ReplayReader:
+    """Memory-maps a replay file and decodes its input runs on demand."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        if os.fstat(self.file.fileno()).st_size == 0:  # mmap refuses empty files
+            self.file.close()
+            raise ValueError(f"{path} is empty, not a replay file")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        version = self.data[len(MAGIC):len(MAGIC) + 1]
+        if self.data[:len(MAGIC)] != MAGIC or not version or not 1 <= version[0] <= VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a replay file")
+        self.version = version[0]
+        length, pos = read_varint(self.data, len(MAGIC) + 1)
+        if length is None or pos + length > len(self.data):
+            self.close()
+            raise ValueError(f"{path} ends inside its header")
+        header = json.loads(self.data[pos:pos + length])
+        self.game = header["game"]
+        self.seed = header["seed"]
+        self.params = header["params"]
+        self.start = pos + length
+        self.final_digest = None  # Set once runs() reaches the end marker
+        self.total = None
+
+    def runs(self):
+        """Yields (code, count) pairs; stops early on a truncated recording.
+
+        A run or end marker cut off by the end of the file counts as the end
+        of the stream, so final_digest stays None and the replay reads as
+        incomplete rather than mismatched.
+        """
+        data, pos, end = self.data, self.start, len(self.data)
+        mask = (1 << CODE_BITS) - 1
+        while pos < end:
+            value, pos = read_varint(data, pos)
+            if value is None:
+                return
+            if value == 0:
+                total, _ = read_varint(data, pos + 8)  # None unless the digest is whole too
+                if total is not None:
+                    self.final_digest = data[pos:pos + 8]
+                    self.total = total
+                return
+            yield value & mask, value >> CODE_BITS
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+ReplayResult = namedtuple("ReplayResult", "game inputs seconds matches speedup")
+
+
+def replay(path):
+    """Replays a file headlessly; `matches` is None when it has no final digest."""
+    with ReplayReader(path) as reader:
+        spec = GAMES[reader.game]
+        game = spec.create(reader.seed, reader.params)
+        if reader.version == 1 and spec.tick_rate:
+            _format_1_physics(game)
+        step = spec.step
+        if (reader.version == 1 and reader.game == "2048-adaptive"
+                and not any(code in (REDO, NEXT_BRANCH) for code, _ in reader.runs())):
+            step = _format_1_undo(game)
+        inputs = 0
+        start = time.perf_counter()
+        for code, count in reader.runs():
+            for _ in range(count):
+                step(game, code)
+            inputs += count
+        seconds = time.perf_counter() - start
+        expected = reader.final_digest
+        matches = None if expected is None else spec.state(game) == expected
+    speedup = inputs / spec.tick_rate / seconds if spec.tick_rate and seconds else None
+    return ReplayResult(reader.game, inputs, seconds, matches, speedup)
+
+
+def main(paths):
+    failed = False
+    for path in paths:
+        try:
+            result = replay(path)
+        except ValueError as error:
+            print(error)
+            failed = True
+            continue
+        status = {True: "OK", False: "MISMATCH", None: "INCOMPLETE"}[result.matches]
+        rate = result.inputs / result.seconds if result.seconds else float("inf")
+        speed = f", {result.speedup:,.0f}x real time" if result.speedup else ""
+        print(f"{path}: {result.game}, {result.inputs} inputs in {result.seconds:.3f}s "
+              f"({rate:,.0f}/s{speed}) {status}")
+        failed |= result.matches is False
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,404 @@
+"""Parallel rollouts: worker processes stepping slices of environments.
+
+RolloutPool splits N environments of one game (envs.py) into contiguous
+slices, one per worker process. Actions, observations, rewards, done and
+truncated flags and scores live in multiprocessing.shared_memory arrays
+that every process maps, so a step moves no data through pipes or pickle:
+the parent writes the actions, workers read their slice and write their
+results in place.
+
+The per-step handshake is lock-free. Each worker has two counters, on
+separate cache lines so the parent and worker never write the same line:
+the parent bumps the worker's request counter after writing actions, the
+worker steps its slice and stores the same number in its reply counter.
+Each counter has exactly one writer, and every store happens after the
+data it announces, so a reader that sees the new number sees the data
+too (CPython issues the stores in program order and x86-64 keeps them in
+that order). A waiter spins for a while and then backs off into short
+sleeps, so idle workers and oversubscribed machines do not burn the CPU
+the others need.
+
+Other processors (ARM, POWER) may make stores visible out of order, so
+there the pool hands out commands and collects replies through one pipe
+per worker instead; the send and receive system calls order the memory
+accesses. The data itself stays in shared memory either way.
+
+Worker slices either run a vectorized environment (VecFlappyEnv and
+friends) or, with scalar=True, a list of the scalar environments wrapping
+the simulations the games themselves run. Scalar environments get one
+seed each from the pool seed, so their episodes do not depend on the
+worker count; a vectorized slice gets one seed per worker.
+
+Running this module measures steps per second from 1 to 32 workers
+against workers that send their results back through pipes.
+"""
+
+import argparse
+import multiprocessing
+import os
+import platform
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from envs import EggEnv, FlappyEnv, PongEnv, VecEggEnv, VecFlappyEnv, VecPongEnv
+
+GAMES = {
+    "flappy": (FlappyEnv, VecFlappyEnv),
+    "egg": (EggEnv, VecEggEnv),
+    "pong": (PongEnv, VecPongEnv),
+}
+
+STEP, RESET, STOP = 1, 2, 3
+LINE = 8  # int64s per 64-byte cache line
+SPINS = 2000  # Busy polls before a waiter starts sleeping
+MIN_SLEEP, MAX_SLEEP = 1e-5, 2e-4  # Backoff between polls after that, in seconds
+LIVENESS_INTERVAL = 100  # Sleeps between checks that the workers are alive
+# The counter handshake relies on x86 total store order
+ORDERED_STORES = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686", "x86")
+
+
+class EnvSlice:
+    """Scalar environments behind the vectorized interface (auto-reset, max_steps)."""
+
+    def __init__(self, make_env, seeds, obs_type="state", max_steps=None):
+        self.envs = [make_env(seed=seed, obs_type=obs_type) for seed in seeds]
+        self.n = len(self.envs)
+        self.n_actions = self.envs[0].n_actions
+        self.max_steps = max_steps
+        self.steps = np.zeros(self.n, dtype=np.int64)
+        self.episodes = 0
+
+    def reset(self):
+        self.steps[:] = 0
+        return np.stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        observations = []
+        rewards = np.zeros(self.n, dtype=np.float32)
+        done = np.zeros(self.n, dtype=bool)
+        truncated = np.zeros(self.n, dtype=bool)
+        scores = np.zeros(self.n, dtype=np.int64)
+        self.steps += 1
+        for i, (env, action) in enumerate(zip(self.envs, actions.tolist())):
+            observation, rewards[i], done[i], info = env.step(action)
+            scores[i] = info["score"]
+            if not done[i] and self.max_steps and self.steps[i] >= self.max_steps:
+                truncated[i] = True
+            if done[i] or truncated[i]:
+                self.episodes += 1
+                self.steps[i] = 0
+                observation = env.reset()
+            observations.append(observation)
+        return np.stack(observations), rewards, done | truncated, {"score": scores, "truncated": truncated}
+
+
+def make_slice(game, count, seed, obs_type="state", max_steps=None, scalar=False):
+    """The `count` environments one worker steps: an EnvSlice or a Vec*Env.
+
+    seed is a list of one seed per environment for a scalar slice and a
+    single seed for a vectorized one.
+    """
+    make_scalar, make_vec = GAMES[game]
+    if scalar:
+        return EnvSlice(make_scalar, seed, obs_type, max_steps)
+    return make_vec(count, seed=seed, obs_type=obs_type, max_steps=max_steps)
+
+
+class SharedArrays:
+    """Named NumPy arrays, each in its own shared memory block."""
+
+    def __init__(self, specs, blocks=None):
+        self.specs = specs
+        # Forked children inherit this object too; only the creating process unlinks
+        self.owner = os.getpid() if blocks is None else None
+        if blocks is None:
+            blocks = {name: shared_memory.SharedMemory(
+                create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+                for name, (shape, dtype) in specs.items()}
+        self.blocks = blocks
+        self.arrays = {name: np.ndarray(shape, dtype, buffer=blocks[name].buf)
+                       for name, (shape, dtype) in specs.items()}
+        if self.owner:
+            for array in self.arrays.values():
+                array.fill(0)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __getstate__(self):
+        # Other processes attach to the same blocks by name
+        return self.specs, {name: block.name for name, block in self.blocks.items()}
+
+    def __setstate__(self, state):
+        specs, names = state
+        self.__init__(specs, {key: shared_memory.SharedMemory(name=name) for key, name in names.items()})
+
+    def close(self):
+        self.arrays = {}
+        for block in self.blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass  # A caller still holds a view; the mapping goes when it does
+            if self.owner == os.getpid():
+                block.unlink()
+
+
+def _backoff(polls, spins):
+    """Sleeps between polls once spinning has not paid off, doubling up to MAX_SLEEP."""
+    if polls > spins:
+        time.sleep(min(MIN_SLEEP * 2 ** min(polls - spins, 16), MAX_SLEEP))
+
+
+def _wait(counter, value, spins=SPINS):
+    """Polls until counter[0] == value."""
+    polls = 0
+    while counter[0] != value:
+        polls += 1
+        _backoff(polls, spins)
+
+
+def _worker(index, lo, hi, shared, game, seed, obs_type, max_steps, scalar, spins, connection=None):
+    """Steps one slice per request; connection carries the handshake when it is not lock-free."""
+    envs = make_slice(game, hi - lo, seed, obs_type, max_steps, scalar)
+    request = shared["control"][2 * index]
+    reply = shared["control"][2 * index + 1]
+    actions, observations = shared["actions"][lo:hi], shared["observations"][lo:hi]
+    rewards, dones = shared["rewards"][lo:hi], shared["dones"][lo:hi]
+    truncated, scores = shared["truncated"][lo:hi], shared["scores"][lo:hi]
+    served = 0
+    while True:
+        if connection is None:
+            _wait(request, served + 1, spins)
+            command = request[1]
+        else:
+            command = connection.recv()
+        served += 1
+        if command == RESET:
+            observations[:] = envs.reset()
+            rewards[:] = 0
+            dones[:] = truncated[:] = False
+            scores[:] = 0
+        elif command == STEP:
+            observation, reward, done, info = envs.step(actions)
+            observations[:] = observation
+            rewards[:] = reward
+            dones[:] = done
+            truncated[:] = info["truncated"]
+            scores[:] = info["score"]
+        if connection is None:
+            reply[0] = served  # Published last: the results above are complete
+        else:
+            connection.send(served)
+        if command == STOP:
+            break
+    del request, reply, actions, observations, rewards, dones, truncated, scores
+    shared.close()
+
+
+class RolloutPool:
+    """N environments of one game stepped in parallel by worker processes.
+
+    step() returns views into shared memory that the next step overwrites;
+    copy them to keep them. lock_free picks the handshake: shared counters
+    (only allowed where stores are ordered) or pipes; the default is the
+    counters on x86 and pipes elsewhere.
+    """
+
+    def __init__(self, game, n, workers=None, seed=None, obs_type="state", max_steps=None,
+                 scalar=False, spins=None, lock_free=None):
+        if lock_free is None:
+            lock_free = ORDERED_STORES
+        elif lock_free and not ORDERED_STORES:
+            raise ValueError(f"the lock-free handshake needs x86 store ordering, not {platform.machine()}")
+        workers = min(n, workers or os.cpu_count() or 1)
+        self.n = n
+        self.workers = workers
+        self.bounds = np.linspace(0, n, workers + 1).astype(int)
+        probe = GAMES[game][1](1, seed=0, obs_type=obs_type).observe()
+        self.n_actions = GAMES[game][1].n_actions
+        self.shared = SharedArrays({
+            "control": ((2 * workers, LINE), np.int64),
+            "actions": ((n,), np.int64),
+            "observations": ((n,) + probe.shape[1:], probe.dtype),
+            "rewards": ((n,), np.float32),
+            "dones": ((n,), bool),
+            "truncated": ((n,), bool),
+            "scores": ((n,), np.int64),
+        })
+        self.control = self.shared["control"]
+        self.actions = self.shared["actions"]
+        self.observations = self.shared["observations"]
+        self.rewards = self.shared["rewards"]
+        self.dones = self.shared["dones"]
+        self.info = {"score": self.shared["scores"], "truncated": self.shared["truncated"]}
+        self.posted = 0
+        if spins is None:
+            # Spinning only pays off when every process has a core to spin on
+            spins = SPINS if workers < (os.cpu_count() or 1) else 0
+        self.spins = spins
+
+        seeds = np.random.SeedSequence(seed).spawn(n if scalar else workers)
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods()
+                                              else None)
+        self.processes = []
+        self.connections = None if lock_free else []
+        for index in range(workers):
+            lo, hi = self.bounds[index], self.bounds[index + 1]
+            slice_seed = seeds[lo:hi] if scalar else seeds[index]
+            child = None
+            if not lock_free:
+                parent, child = context.Pipe()
+                self.connections.append(parent)
+            process = context.Process(
+                target=_worker, name=f"rollout-{index}", daemon=True,
+                args=(index, lo, hi, self.shared, game, slice_seed, obs_type, max_steps, scalar,
+                      self.spins, child))
+            process.start()
+            self.processes.append(process)
+        self.reset()
+
+    def _post(self, command):
+        """Hands every worker the next command and waits until all have answered."""
+        self.posted += 1
+        if self.connections is not None:
+            for connection in self.connections:
+                connection.send(command)
+            for connection in self.connections:
+                while not connection.poll(MAX_SLEEP * LIVENESS_INTERVAL):
+                    self._check_workers()
+                connection.recv()
+            return
+        requests = self.control[0::2]
+        replies = self.control[1::2, 0]
+        requests[:, 1] = command
+        requests[:, 0] = self.posted  # Published after the command and the actions
+        polls = 0
+        while (replies != self.posted).any():
+            polls += 1
+            _backoff(polls, self.spins)
+            if polls > self.spins and polls % LIVENESS_INTERVAL == 0:
+                self._check_workers()
+
+    def _check_workers(self):
+        for process in self.processes:
+            if not process.is_alive():
+                raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+
+    def reset(self):
+        """Starts a new episode everywhere; returns the observations."""
+        self._post(RESET)
+        return self.observations
+
+    def step(self, actions):
+        """Steps every environment; finished ones reset in place like the Vec*Env."""
+        self.actions[:] = actions
+        self._post(STEP)
+        return self.observations, self.rewards, self.dones, self.info
+
+    def close(self):
+        if self.processes:
+            if all(process.is_alive() for process in self.processes):
+                self._post(STOP)
+            for process in self.processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self.processes = []
+        for connection in self.connections or ():
+            connection.close()
+        self.connections = None
+        self.control = self.actions = self.observations = self.rewards = self.dones = None
+        self.info = {}
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _pipe_worker(connection, game, count, seed, obs_type, scalar):
+    # The baseline the pool replaces: results pickled back through a pipe every step
+    envs = make_slice(game, count, seed, obs_type, None, scalar)
+    connection.send(envs.reset())
+    while True:
+        actions = connection.recv()
+        if actions is None:
+            break
+        connection.send(envs.step(actions))
+
+
+def _pipe_rate(game, n, workers, steps, actions, obs_type, scalar):
+    context = multiprocessing.get_context()
+    bounds = np.linspace(0, n, workers + 1).astype(int)
+    seeds = np.random.SeedSequence(0).spawn(n if scalar else workers)
+    connections, processes = [], []
+    for index in range(workers):
+        lo, hi = bounds[index], bounds[index + 1]
+        parent, child = context.Pipe()
+        process = context.Process(target=_pipe_worker, daemon=True, args=(
+            child, game, hi - lo, seeds[lo:hi] if scalar else seeds[index], obs_type, scalar))
+        process.start()
+        connections.append(parent)
+        processes.append(process)
+    for connection in connections:
+        connection.recv()
+    start = time.perf_counter()
+    for step in range(steps):
+        for index, connection in enumerate(connections):
+            connection.send(actions[step, bounds[index]:bounds[index + 1]])
+        results = [connection.recv() for connection in connections]
+        observations = np.concatenate([result[0] for result in results])
+    elapsed = time.perf_counter() - start
+    for connection, process in zip(connections, processes):
+        connection.send(None)
+        process.join()
+    del observations
+    return steps * n / elapsed
+
+
+def _benchmark(games, n, worker_counts, steps, obs_type="state", scalar=True):
+    print(f"{os.cpu_count()} CPUs; {n} {'scalar' if scalar else 'vectorized'} environments, "
+          f"{obs_type} observations")
+    for game in games:
+        rng = np.random.default_rng(0)
+        actions = rng.integers(GAMES[game][1].n_actions, size=(steps, n))
+        envs = make_slice(game, n, np.random.SeedSequence(0).spawn(n) if scalar else 0, obs_type,
+                          None, scalar)
+        start = time.perf_counter()
+        for step_actions in actions:
+            envs.step(step_actions)
+        single = steps * n / (time.perf_counter() - start)
+        print(f"\n{game}: in-process {single:,.0f} steps/s")
+        print(f"{'workers':>7} {'shared memory':>14} {'speedup':>8} {'pipes':>12}")
+        for workers in worker_counts:
+            with RolloutPool(game, n, workers, seed=0, obs_type=obs_type, scalar=scalar) as pool:
+                start = time.perf_counter()
+                for step_actions in actions:
+                    pool.step(step_actions)
+                shared = steps * n / (time.perf_counter() - start)
+            piped = _pipe_rate(game, n, workers, steps, actions, obs_type, scalar)
+            print(f"{workers:>7} {shared:>14,.0f} {shared / single:>7.2f}x {piped:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared-memory rollout workers.")
+    parser.add_argument("--games", nargs="+", choices=sorted(GAMES), default=["flappy", "pong"])
+    parser.add_argument("--envs", type=int, default=None,
+                        help="environments in total (default 256 scalar, 65536 vectorized)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--obs-type", choices=("state", "frame"), default="state")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="give every worker a Vec*Env instead of scalar environments")
+    args = parser.parse_args()
+    n = args.envs or (65536 if args.vectorized else 256)
+    _benchmark(args.games, n, args.workers, args.steps, args.obs_type, not args.vectorized)
+
+
+if __name__ == "__main__":
+    main()
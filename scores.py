@@ -0,0 +1,133 @@
+"""High score and leaderboard persistence that stays off the move path.
+
+ScoreKeeper holds the high score in memory. submit() after a move is a
+comparison and an assignment; a daemon thread writes the high score file
+every few seconds when it changed, and game_over()/close() write it
+straight away. Writes go to a temp file that is renamed over the old one,
+so a crash mid-write never leaves a truncated high_score.txt.
+
+Finished games are appended as one JSON line each to a log shared by all
+variants and players. The log is only ever appended to; leaderboard()
+replays it into per-(player, variant) top scores.
+"""
+
+import getpass
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+
+def atomic_write(path, text):
+    """Replaces path with text via a temp file in the same directory and a rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        # mkstemp creates the file 0600; keep the old file's mode instead
+        mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "player"
+
+
+def read_log(log_path):
+    """Yields every game record in the log, skipping a torn last line."""
+    if not os.path.exists(log_path):
+        return
+    with open(log_path, "r") as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def leaderboard(log_path="scores.log", variant=None, player=None, top=10):
+    """Best `top` games per (player, variant), highest score first."""
+    boards = defaultdict(list)
+    for record in read_log(log_path):
+        if variant is not None and record["variant"] != variant:
+            continue
+        if player is not None and record["player"] != player:
+            continue
+        boards[record["player"], record["variant"]].append(record)
+    return {key: sorted(games, key=lambda r: r["score"], reverse=True)[:top]
+            for key, games in boards.items()}
+
+
+class ScoreKeeper:
+    """In-memory high score with background, atomic flushing and a game log."""
+
+    def __init__(self, variant, high_score_path="high_score.txt", log_path="scores.log",
+                 player=None, flush_interval=5.0):
+        self.variant = variant
+        self.high_score_path = high_score_path
+        self.log_path = log_path
+        self.player = player or default_player()
+        self.flush_interval = flush_interval
+        self.high_score = self.saved = self._load()
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._flush_loop, name="score-flush", daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        if os.path.exists(self.high_score_path):
+            with open(self.high_score_path, "r") as file:
+                try:
+                    return int(file.read().strip())
+                except ValueError:
+                    return 0
+        return 0
+
+    def submit(self, score):
+        """Records a score after a move; never blocks on disk."""
+        if score > self.high_score:
+            self.high_score = score
+
+    def flush(self):
+        """Writes the high score file if it changed since the last write."""
+        with self.lock:
+            score = self.high_score
+            if score != self.saved:
+                atomic_write(self.high_score_path, str(score))
+                self.saved = score
+
+    def _flush_loop(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+
+    def game_over(self, score, moves=0, highest_tile=0):
+        """Appends a finished game to the log and flushes the high score."""
+        self.submit(score)
+        record = {"player": self.player, "variant": self.variant, "score": score,
+                  "moves": moves, "highest_tile": highest_tile, "time": round(time.time())}
+        with self.lock:
+            with open(self.log_path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+        self.flush()
+
+    def leaderboard(self, top=10):
+        """This player's best games in this variant."""
+        return leaderboard(self.log_path, self.variant, self.player, top).get((self.player, self.variant), [])
+
+    def close(self):
+        """Stops the flush thread and writes any pending high score."""
+        self.stopping.set()
+        self.thread.join()
+        self.flush()
@@ -0,0 +1,85 @@
+"""Batched sprite drawing for scenes with many identical entities.
+
+A SpriteBatch holds one pre-rendered surface (converted to the display
+format once) and draws every instance of it in a single Surface.blits()
+call, skipping instances that are entirely off screen. That replaces one
+pygame.draw.circle() or screen.blit() call per ball or egg.
+
+Running this module benchmarks per-entity drawing against the batch from
+10 to 50,000 entities and prints the frames per second of each.
+"""
+
+import time
+from itertools import repeat
+
+import numpy as np
+import pygame
+
+
+class SpriteBatch:
+    """Draws many copies of one surface with a single blits() call."""
+
+    def __init__(self, surface, centered=False):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        # Positions are the sprite centre (balls) or its top-left (images)
+        self.offset = (self.width / 2, self.height / 2) if centered else (0, 0)
+        self.drawn = 0
+        self.culled = 0
+
+    @classmethod
+    def circle(cls, radius, color):
+        """Pre-renders a filled circle once and batches it by centre position."""
+        # A run-length encoded colorkey blits much faster than per-pixel alpha
+        key = (255, 0, 255) if tuple(color[:3]) != (255, 0, 255) else (0, 255, 0)
+        surface = pygame.Surface((2 * radius, 2 * radius)).convert()
+        surface.fill(key)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        surface.set_colorkey(key, pygame.RLEACCEL)
+        return cls(surface, centered=True)
+
+    def draw(self, screen, xs, ys):
+        """Blits the sprite at every (x, y) that overlaps the screen."""
+        xs = np.asarray(xs, dtype=np.float64) - self.offset[0]
+        ys = np.asarray(ys, dtype=np.float64) - self.offset[1]
+        screen_width, screen_height = screen.get_size()
+        visible = (xs > -self.width) & (xs < screen_width) & (ys > -self.height) & (ys < screen_height)
+        xs, ys = xs[visible], ys[visible]
+        self.drawn = len(xs)
+        self.culled = len(visible) - self.drawn
+        if self.drawn:
+            positions = zip(xs.astype(np.int64).tolist(), ys.astype(np.int64).tolist())
+            screen.blits(zip(repeat(self.surface), positions), doreturn=False)
+        return self.drawn
+
+
+def _benchmark(counts=(10, 100, 1000, 10_000, 50_000), frames=60, radius=10):
+    screen = pygame.display.set_mode((600, 400))
+    batch = SpriteBatch.circle(radius, (255, 0, 0))
+    rng = np.random.default_rng(0)
+    print(f"{'entities':>8}  {'draw.circle fps':>15}  {'SpriteBatch fps':>15}")
+    for count in counts:
+        xs = rng.uniform(-50, 650, (frames, count))
+        ys = rng.uniform(-50, 450, (frames, count))
+
+        start = time.perf_counter()
+        for frame in range(frames):
+            screen.fill((0, 0, 0))
+            for x, y in zip(xs[frame].tolist(), ys[frame].tolist()):
+                pygame.draw.circle(screen, (255, 0, 0), (x, y), radius)
+            pygame.display.flip()
+        per_entity = frames / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for frame in range(frames):
+            screen.fill((0, 0, 0))
+            batch.draw(screen, xs[frame], ys[frame])
+            pygame.display.flip()
+        batched = frames / (time.perf_counter() - start)
+        print(f"{count:>8}  {per_entity:>15.1f}  {batched:>15.1f}")
+
+
+if __name__ == "__main__":
+    pygame.init()
+    _benchmark()
+    pygame.quit()
@@ -0,0 +1,213 @@
+"""Swept (continuous) collision tests with time of impact.
+
+The arcade games test collisions by checking positions once per tick,
+which is fine while nothing moves further in a tick than the thing it can
+hit is thick. With larger steps (FlappySim/EggSim/PongSim.step(dt=...)),
+a fast egg, ball or bird can start a step on one side of the basket,
+paddle or pipe and end it on the other. These functions instead look at
+the whole motion of a step.
+
+Every test is between a box moving by (vx, vy) over the step and a
+static box; give the velocity relative to the other box when both move.
+Points are boxes of size 0. The circles in the games collide by their
+bounding box (bird) or contact point (ball bottom, egg), so boxes and
+points are all the games need.
+
+    time_of_impact()   one pair, plain floats; None when they never touch
+    times_of_impact()  NumPy arrays elementwise; inf where they never touch
+
+Time runs from 0 (start of the step) to 1 (end of the step). A pair that
+already overlaps at the start has time 0, and the test at time 1 agrees
+with the old per-tick check, so sweeping only ever adds hits. Boxes are
+open (touching edges do not count) unless closed=True, matching the `<`
+and `<=` comparisons of the checks they replace.
+
+Running this module checks the sweeps against densely sub-stepped point
+checks for objects fired at a wide range of velocities, then counts the
+hits each game misses at growing step sizes with and without sweeping,
+exiting non-zero if sweeping ever catches fewer.
+"""
+
+import math
+import sys
+
+import numpy as np
+
+
+def _slab(lo, size, v, other_lo, other_size, closed):
+    """Times the interval [lo, lo + size] moving by v overlaps the static other one."""
+    if v == 0:
+        if closed:
+            overlapping = lo <= other_lo + other_size and other_lo <= lo + size
+        else:
+            overlapping = lo < other_lo + other_size and other_lo < lo + size
+        return (-math.inf, math.inf) if overlapping else (math.inf, -math.inf)
+    enter = (other_lo - (lo + size)) / v
+    leave = (other_lo + other_size - lo) / v
+    return (enter, leave) if v > 0 else (leave, enter)
+
+
+def time_of_impact(x, y, w, h, vx, vy, bx, by, bw, bh, closed=False):
+    """First time in [0, 1] the moving box (x, y, w, h) overlaps box (bx, by, bw, bh).
+
+    Returns None if they do not overlap during the step.
+    """
+    enter_x, leave_x = _slab(x, w, vx, bx, bw, closed)
+    enter_y, leave_y = _slab(y, h, vy, by, bh, closed)
+    enter = max(enter_x, enter_y)
+    leave = min(leave_x, leave_y)
+    if closed:
+        hit = enter <= leave and enter <= 1 and leave >= 0
+    else:
+        hit = enter < leave and enter < 1 and leave > 0
+    return max(enter, 0.0) if hit else None
+
+
+def _slabs(lo, size, v, other_lo, other_size, closed):
+    if closed:
+        overlapping = (lo <= other_lo + other_size) & (other_lo <= lo + size)
+    else:
+        overlapping = (lo < other_lo + other_size) & (other_lo < lo + size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = (other_lo - (lo + size)) / v
+        b = (other_lo + other_size - lo) / v
+    still = v == 0
+    enter = np.where(still, np.where(overlapping, -np.inf, np.inf), np.minimum(a, b))
+    leave = np.where(still, np.where(overlapping, np.inf, -np.inf), np.maximum(a, b))
+    return enter, leave
+
+
+def times_of_impact(x, y, w, h, vx, vy, bx, by, bw, bh, closed=False):
+    """time_of_impact() over arrays (broadcast together); inf where there is no hit."""
+    x, y, w, h, vx, vy, bx, by, bw, bh = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (x, y, w, h, vx, vy, bx, by, bw, bh)))
+    enter_x, leave_x = _slabs(x, w, vx, bx, bw, closed)
+    enter_y, leave_y = _slabs(y, h, vy, by, bh, closed)
+    enter = np.maximum(enter_x, enter_y)
+    leave = np.minimum(leave_x, leave_y)
+    if closed:
+        hit = (enter <= leave) & (enter <= 1) & (leave >= 0)
+    else:
+        hit = (enter < leave) & (enter < 1) & (leave > 0)
+    return np.where(hit, np.maximum(enter, 0.0), np.inf)
+
+
+def _sampled_hit(x, y, w, h, vx, vy, bx, by, bw, bh, closed, samples=4001):
+    """Brute force: does any of `samples` evenly spaced times overlap?"""
+    t = np.linspace(0, 1, samples)
+    left, top = x + vx * t, y + vy * t
+    if closed:
+        inside = (left <= bx + bw) & (bx <= left + w) & (top <= by + bh) & (by <= top + h)
+    else:
+        inside = (left < bx + bw) & (bx < left + w) & (top < by + bh) & (by < top + h)
+    return t[np.argmax(inside)] if inside.any() else None
+
+
+def _check(cases=20_000, seed=0):
+    """Fires boxes and points at a target box and compares with brute-force sampling."""
+    rng = np.random.default_rng(seed)
+    target = (0.0, 0.0, 40.0, 10.0)
+    mismatches = 0
+    for case in range(cases):
+        speed = 10.0 ** rng.uniform(-1, 3)  # 0.1 to 1000 units per step
+        angle = rng.uniform(0, 2 * math.pi)
+        vx, vy = speed * math.cos(angle), speed * math.sin(angle)
+        if case % 7 == 0:
+            vx = 0.0  # Axis-aligned shots exercise the v == 0 branch
+        w, h = (0.0, 0.0) if case % 2 else tuple(rng.uniform(0, 20, 2))
+        x, y = rng.uniform(-600, 600, 2)
+        closed = bool(case % 3 == 0)
+        toi = time_of_impact(x, y, w, h, vx, vy, *target, closed=closed)
+        vector = times_of_impact(x, y, w, h, vx, vy, *target, closed=closed)
+        assert (toi is None) == np.isinf(vector) and (toi is None or math.isclose(toi, vector)), case
+        sampled = _sampled_hit(x, y, w, h, vx, vy, *target, closed)
+        if sampled is None:
+            # Sampling can miss a sliver of contact, never invent one
+            if toi is not None:
+                mismatches += 1
+            continue
+        assert toi is not None and toi <= sampled + 1e-9, (case, toi, sampled)
+        assert sampled - toi <= 1 / 4000 + 1e-9, (case, toi, sampled)
+
+    # Tunnelling: a point crossing a 1-unit wall at 1000 units per step
+    assert time_of_impact(-500.0, 0.5, 0, 0, 1000.0, 0, 0, 0, 1, 1) == 0.5
+    # Already overlapping at the start, moving apart
+    assert time_of_impact(0.5, 0.5, 0, 0, -10.0, 0, 0, 0, 1, 1) == 0.0
+    # Touching edges only count for closed boxes
+    assert time_of_impact(-1.0, 0.0, 1, 1, 0, 0, 0, 0, 1, 1) is None
+    assert time_of_impact(-1.0, 0.0, 1, 1, 0, 0, 0, 0, 1, 1, closed=True) == 0.0
+    # Ends exactly on the edge
+    assert time_of_impact(-2.0, 0.5, 0, 0, 2.0, 0, 0, 0, 1, 1) is None
+    assert time_of_impact(-2.0, 0.5, 0, 0, 2.0, 0, 0, 0, 1, 1, closed=True) == 1.0
+    return cases, mismatches
+
+
+def _missed_hits(dts=(1, 4, 16, 32, 64), steps=20_000):
+    """Counts each game's hits at growing step sizes, swept against end-of-step checks.
+
+    Returns the (game, dt) pairs where sweeping caught fewer hits, or the
+    hovering bird flew through a pipe.
+    """
+    from arcade import EggSim, FlappySim, PongSim
+
+    def egg_policy(sim, rng):
+        left = bool(rng.random() < 0.5)
+        return {"left": left, "right": not left}
+
+    def pong_policy(sim, rng):
+        # Follow the lowest ball
+        target = sim.balls.x[np.argmax(sim.balls.y)] if len(sim.balls) else sim.WIDTH / 2
+        centre = sim.paddle_x + sim.paddle_width / 2
+        return {"left": target < centre, "right": target > centre}
+
+    failures = []
+    print(f"\n{'game':<8} {'dt':>3} {'per-tick hits':>14} {'swept hits':>11}")
+    for dt in dts:
+        for name, make, hits, policy in (("egg", EggSim, lambda sim: sim.score, egg_policy),
+                                         ("pong", PongSim, lambda sim: sim.score // 10, pong_policy)):
+            counts = []
+            for swept in (False, True):
+                sim = make(seed=3)
+                sim.swept = swept
+                rng = np.random.default_rng(3)
+                total = 0
+                for _ in range(steps // dt):
+                    before = hits(sim)
+                    sim.step(dt=dt, **policy(sim, rng))
+                    total += hits(sim) - before
+                    # Pong balls leave through the open top: serve again once none falls
+                    if sim.game_over or (name == "pong" and not (sim.balls.dy > 0).any()):
+                        sim.reset()
+                counts.append(total)
+            print(f"{name:<8} {dt:>3} {counts[0]:>14} {counts[1]:>11}")
+            if counts[1] < counts[0]:
+                failures.append((name, dt))
+
+        crashed = []
+        for swept in (False, True):
+            # A bird hovering level with the top pipes must crash into every pipe
+            sim = FlappySim(seed=3)
+            sim.swept = swept
+            sim.gravity = 0
+            pipes = set()
+            for _ in range(steps // dt):
+                sim.bird_y = 20.0
+                sim.step(dt=dt)
+                if sim.game_over:
+                    pipes.add(sim.score)  # score numbers the pipes
+                    sim.game_over = False
+            crashed.append(len(pipes))
+        print(f"{'flappy':<8} {dt:>3} {crashed[0]:>14} {crashed[1]:>11}")
+        if crashed[1] < sim.score:  # Every pipe that went past must have been hit
+            failures.append(("flappy", dt))
+    return failures
+
+
+if __name__ == "__main__":
+    cases, slivers = _check()
+    print(f"{cases} fired objects agree with brute-force sampling "
+          f"({slivers} contacts thinner than the sampling step)")
+    failures = _missed_hits()
+    if failures:
+        print("sweeping missed hits:", ", ".join(f"{name} at dt={dt}" for name, dt in failures))
+        sys.exit(1)
@@ -0,0 +1,107 @@
+"""Shared font and rendered-text cache for all the games.
+
+get_font() builds each (name, size) Font once. TextCache memoizes the
+surfaces Font.render() returns, keyed by (text, size, color, antialias,
+font name, background), in a bounded LRU: static labels such as
+"Game Over!" and scores that rarely change are rendered once, while a
+string that changes every second (the 2048 timer) just cycles through the
+oldest entries instead of growing the cache.
+
+Most callers use the module-level render_text(), which goes through one
+shared cache. Running this module compares building a Font and rendering
+the HUD every frame (what the arcade games did), rendering it with one
+shared Font every frame, and the cache.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(size, name=None):
+    """The Font for (size, name), created on first use."""
+    return pygame.font.Font(name, size)
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, text, size, color, antialias=True, font_name=None, background=None):
+        """Returns the rendered surface, drawing it only on a cache miss.
+
+        The surface is shared, so callers must blit it and not draw on it.
+        """
+        key = (text, size, tuple(color), antialias, font_name,
+               None if background is None else tuple(background))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        font = get_font(size, font_name)
+        surface = self.surfaces[key] = font.render(text, antialias, color, background)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(text, size, color, antialias=True, font_name=None, background=None):
+    """Renders text through the shared cache."""
+    return text_cache.render(text, size, color, antialias, font_name, background)
+
+
+if __name__ == "__main__":
+    import time
+
+    pygame.init()
+    screen = pygame.display.set_mode((600, 400))
+    frames = 2000
+
+    def hud(frame):
+        # Egg-catching style HUD: score changes now and then, lives rarely
+        return (f"Score: {frame // 50}", f"Lives: {3 - frame // 1000}")
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        font = pygame.font.Font(None, 36)
+        for text in hud(frame):
+            screen.blit(font.render(text, True, (0, 0, 0)), (10, 10))
+    per_frame_font = (time.perf_counter() - start) / frames
+
+    font = get_font(36)
+    start = time.perf_counter()
+    for frame in range(frames):
+        for text in hud(frame):
+            screen.blit(font.render(text, True, (0, 0, 0)), (10, 10))
+    per_frame_render = (time.perf_counter() - start) / frames
+
+    cache = TextCache()
+    start = time.perf_counter()
+    for frame in range(frames):
+        for text in hud(frame):
+            screen.blit(cache.render(text, 36, (0, 0, 0)), (10, 10))
+    per_frame_cached = (time.perf_counter() - start) / frames
+
+    print(f"{'new Font + render every frame:':<34}{per_frame_font * 1e6:8.1f} us/frame")
+    print(f"{'shared Font, render every frame:':<34}{per_frame_render * 1e6:8.1f} us/frame")
+    print(f"{'TextCache:':<34}{per_frame_cached * 1e6:8.1f} us/frame "
+          f"({cache.hits} hits, {cache.misses} misses, {len(cache)} entries)")
+    pygame.quit()